@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,7 +51,9 @@ REST_FRAMEWORK = {
 }
 # ...existing code...
 MIDDLEWARE = [
+    "jobs.middleware.TimingMiddleware",  # first, so its total covers everything
     "django.middleware.security.SecurityMiddleware",
+    "jobs.middleware.CompressionMiddleware",  # gzip/brotli; keep above anything that edits the body
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware - add this before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
@@ -115,6 +118,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Batch matching writes from worker threads; take the write lock
+            # up front so concurrent transactions wait instead of deadlocking
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -156,3 +165,98 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = "/static/"
+
+# Resume PDF text extraction cache (content-addressed by SHA-256 of the PDF)
+PDF_TEXT_CACHE_DIR = BASE_DIR / "cache" / "pdf_text"
+PDF_TEXT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Background resume text extraction (process pool started on first upload)
+RESUME_EXTRACTION_WORKERS = 2
+RESUME_EXTRACTION_MAX_PENDING = 32
+
+# Page-parallel PDF extraction for long documents
+PDF_PARALLEL_WORKERS = min(4, os.cpu_count() or 1)
+PDF_PARALLEL_MIN_PAGES = 8
+
+# PDF text engines tried in order; later ones are fallbacks for empty or
+# garbled output. pypdf is optional and skipped when not installed.
+PDF_TEXT_ENGINES = ["pypdf", "pdfplumber"]
+PDF_MIN_TEXT_CHARS = 20
+
+# Groq match results cached per (resume bytes, job content, model, prompt version)
+MATCH_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+MATCH_CACHE_MAX_ENTRIES = 5000
+# Expired and least recently used matches are evicted once per this many writes
+MATCH_CACHE_EVICT_EVERY = 100
+
+# Batch matching: concurrent Groq calls per request and jobs per batch
+GROQ_MAX_CONCURRENCY = 8
+MATCH_BATCH_MAX_JOBS = 50
+
+# BM25 index over job titles/descriptions used to shortlist jobs for a resume
+JOB_INDEX_PATH = BASE_DIR / "cache" / "job_index.pickle"
+# Job saves/deletes are appended to a change log next to the index, which is
+# folded into a new snapshot once it holds this many changes
+JOB_INDEX_COMPACT_EVERY = 500
+
+# Response compression (brotli when installed and accepted, else gzip)
+COMPRESSION_MIN_BYTES = 1024
+BROTLI_QUALITY = 5
+
+# Shared Groq client (jobs/groq_client.py). GROQ_API_BASE can point at a
+# local stand-in server for testing. The rate limit is per process.
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+GROQ_TIMEOUT = (5, 60)  # (connect, read) seconds
+GROQ_MAX_RETRIES = 3
+GROQ_RETRY_BACKOFF = 0.5
+GROQ_RETRY_BACKOFF_MAX = 8
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30))
+GROQ_RATE_BURST = int(os.getenv("GROQ_RATE_BURST", 5))
+GROQ_RATE_LIMIT_WAIT = 30
+GROQ_CIRCUIT_FAILURES = 5
+GROQ_CIRCUIT_RESET_SECONDS = 30
+# Connection cap for the async client used by the async views
+GROQ_ASYNC_MAX_CONNECTIONS = 200
+
+# Background match queue (MatchTask rows run by manage.py run_match_worker)
+MATCH_TASK_MAX_ATTEMPTS = 3
+MATCH_TASK_RETRY_DELAY_SECONDS = 30
+MATCH_TASK_TIMEOUT_SECONDS = 10 * 60
+MATCH_TASK_CALLBACK_ATTEMPTS = 3
+MATCH_TASK_CALLBACK_TIMEOUT = 10
+# Callbacks may only go to hosts resolving to public addresses, except these
+# (comma-separated in the environment), e.g. a webhook receiver on the LAN
+MATCH_TASK_CALLBACK_ALLOWED_HOSTS = [
+    host.strip().lower()
+    for host in os.getenv("MATCH_TASK_CALLBACK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+# Token budgets for the resume and job sections of match prompts
+MATCH_PROMPT_RESUME_TOKENS = 2500
+MATCH_PROMPT_JOB_TOKENS = 1500
+
+# Batch job data extraction: descriptions per request and concurrent Groq calls
+EXTRACT_BATCH_MAX = 200
+EXTRACT_BATCH_CONCURRENCY = 8
+
+# Serve paginated_jobs and get_job from a per-process columnar snapshot of the
+# Job table (jobs/catalog.py) instead of the ORM. Changed jobs are patched in;
+# past this share of the catalog changing at once it is rebuilt instead.
+JOB_CATALOG_SNAPSHOT = os.getenv("JOB_CATALOG_SNAPSHOT", "").lower() in ("1", "true")
+JOB_CATALOG_PATCH_MAX_FRACTION = 0.25
+
+# jobs app logs: JSON lines written to stderr by a background thread
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"json": {"()": "jobs.log.JsonFormatter"}},
+    "handlers": {"queue": {"class": "jobs.log.QueueLogHandler", "formatter": "json"}},
+    "loggers": {
+        "jobs": {
+            "handlers": ["queue"],
+            "level": os.getenv("JOBS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
@@ -1,7 +1,11 @@
 from django.contrib import admin
-from .models import Job, Resume
+from .models import Job, JobExtraction, MatchResult, MatchTask, Resume, ResumeText
 
 # Register your models here.
 
 admin.site.register(Job)
 admin.site.register(Resume)
+admin.site.register(ResumeText)
+admin.site.register(MatchResult)
+admin.site.register(MatchTask)
+admin.site.register(JobExtraction)
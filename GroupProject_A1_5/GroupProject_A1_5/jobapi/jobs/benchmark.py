@@ -0,0 +1,221 @@
+"""
+Pieces of the benchmark_api command: a local stand-in for the Groq API, a
+WSGI wrapper that counts DB queries per endpoint, a concurrent load driver
+and latency summaries that can be saved as a baseline and compared.
+"""
+
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.db import connection
+
+# (latency seconds, share of calls answered with a 5xx/429) per profile
+GROQ_PROFILES = {
+    "fast": (0.05, 0.0),
+    "typical": (0.5, 0.01),
+    "slow": (2.0, 0.0),
+    "flaky": (0.5, 0.2),
+}
+
+# Latency varies by this share either side of the profile's value
+GROQ_JITTER = 0.25
+
+# Reply content that parses both as a match and as extracted job data
+FAKE_COMPLETION = {
+    "title": "Software Engineer",
+    "company": "Example Corp",
+    "matchScore": 72,
+    "summary": "Benchmark stand-in answer.",
+    "salary": 0,
+    "experienceLevel": 1,
+    "location": ["Remote"],
+    "jobType": "Full-time",
+    "requirements": ["Python"],
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        time.sleep(server.latency * random.uniform(1 - GROQ_JITTER, 1 + GROQ_JITTER))
+        with server.lock:
+            server.calls += 1
+        if random.random() < server.error_rate:
+            status = random.choice([429, 500, 503])
+            self._send(status, b'{"error": {"message": "stand-in failure"}}')
+            return
+
+        content = json.dumps(FAKE_COMPLETION)
+        if payload.get("stream"):
+            chunk = {"choices": [{"delta": {"content": content}}]}
+            body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+            self._send(200, body, "text/event-stream")
+            return
+        body = {"choices": [{"message": {"role": "assistant", "content": content}}]}
+        self._send(200, json.dumps(body).encode())
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    """
+    OpenAI-style chat completions on 127.0.0.1 with a set latency and error
+    rate; point GROQ_API_BASE at base_url
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency=0.5, error_rate=0.0, port=0):
+        super().__init__(("127.0.0.1", port), FakeGroqHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class QueryCountingApp:
+    """
+    WSGI wrapper recording how many SQL queries each request ran, by path.
+    The body is read inside the wrapper so queries made while streaming
+    count too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            result = self.app(environ, start_response)
+            try:
+                body = b"".join(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        with self.lock:
+            self.counts.setdefault(environ["PATH_INFO"], []).append(queries)
+        return [body]
+
+
+def run_load(base_url, make_request, total, concurrency):
+    """
+    Send total requests from concurrency threads, each with its own
+    keep-alive session. make_request(session, base_url, i) returns a
+    requests.Response. Returns (latencies in seconds, error count, wall time).
+    """
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = make_request(session, base_url, i).status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of values
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies, errors, wall, queries):
+    summary = {
+        f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 2)
+        for pct in PERCENTILES
+    }
+    summary.update(
+        {
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "requests": len(latencies),
+            "errors": errors,
+            "queries_mean": round(statistics.fmean(queries), 2) if queries else 0.0,
+            "queries_max": max(queries, default=0),
+        }
+    )
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return [(endpoint, metric, baseline, current)] for metrics that got worse
+    than the baseline by more than tolerance (a fraction)
+    """
+    regressions = []
+    for endpoint, current in results.items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous:
+            continue
+        for metric in [f"p{pct}_ms" for pct in PERCENTILES] + ["queries_mean"]:
+            if current[metric] > previous[metric] * (1 + tolerance) + 1e-9:
+                regressions.append(
+                    (endpoint, metric, previous[metric], current[metric])
+                )
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append((endpoint, "rps", previous["rps"], current["rps"]))
+        if current["errors"] > previous["errors"]:
+            regressions.append(
+                (endpoint, "errors", previous["errors"], current["errors"])
+            )
+    return regressions
@@ -0,0 +1,336 @@
+"""
+In-memory columnar snapshot of the Job table for the read endpoints.
+
+Each worker process keeps one JobCatalog: ids and numeric fields in NumPy
+arrays, short text fields as int32 codes into a shared pool of interned
+strings, and descriptions as (chunk, start, end) offsets into a few large
+string buffers. When the catalog state (see conditional.catalog_state)
+moves, only the jobs updated since the snapshot and the new tombstones are
+read back and merged in; a snapshot is never modified once published, so
+requests already holding one are unaffected.
+
+Like the ETag, this relies on updated_at: a raw UPDATE that leaves it alone
+isn't seen until the next rebuild.
+"""
+
+import math
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .conditional import catalog_state, job_updated_at
+from .models import Job, JobTombstone
+from .projection import SNIPPET_CHARS
+
+STRING_COLUMNS = (
+    "title",
+    "company",
+    "location",
+    "url",
+    "salary",
+    "job_type",
+    "salary_period",
+    "city",
+    "region",
+    "country",
+)
+NUMBER_COLUMNS = ("salary_min", "salary_max")  # float64, NaN for NULL
+DATETIME_COLUMNS = ("date_posted", "updated_at")  # int64 microseconds, UTC
+
+LOAD_FIELDS = (
+    "id",
+    *STRING_COLUMNS,
+    *NUMBER_COLUMNS,
+    "is_remote",
+    *DATETIME_COLUMNS,
+    "skills",
+    "description",
+)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_lock = threading.Lock()
+_catalog = None
+
+
+class StringPool:
+    """
+    Append-only intern table shared by every snapshot; codes never change
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+        self.lock = threading.Lock()
+
+    def encode(self, values):
+        with self.lock:
+            codes = np.empty(len(values), dtype=np.int32)
+            for i, value in enumerate(values):
+                code = self.codes.get(value)
+                if code is None:
+                    code = self.codes[value] = len(self.strings)
+                    self.strings.append(value)
+                codes[i] = code
+            return codes
+
+
+def _to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _columns_from_rows(rows, pool, chunk_index):
+    """
+    Encode LOAD_FIELDS tuples into column arrays plus one description buffer
+    """
+    by_field = dict(zip(LOAD_FIELDS, zip(*rows))) if rows else {}
+
+    def values(name):
+        return list(by_field.get(name, ()))
+
+    columns = {"id": np.array(values("id"), dtype=np.int64)}
+    for name in STRING_COLUMNS:
+        columns[name] = pool.encode(values(name))
+    for name in NUMBER_COLUMNS:
+        columns[name] = np.array(
+            [np.nan if v is None else v for v in values(name)], dtype=np.float64
+        )
+    columns["is_remote"] = np.array(values("is_remote"), dtype=bool)
+    for name in DATETIME_COLUMNS:
+        columns[name] = np.array(
+            [_to_micros(v) for v in values(name)], dtype=np.int64
+        )
+    columns["skills"] = np.empty(len(rows), dtype=object)
+    columns["skills"][:] = [
+        tuple(pool.encode(list(skills or []))) for skills in values("skills")
+    ]
+
+    descriptions = [d or "" for d in values("description")]
+    lengths = np.array([len(d) for d in descriptions], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    columns["desc_chunk"] = np.full(len(rows), chunk_index, dtype=np.int32)
+    columns["desc_start"] = ends - lengths
+    columns["desc_end"] = ends
+    return columns, "".join(descriptions)
+
+
+class JobCatalog:
+    def __init__(self, columns, chunks, pool, state):
+        self.columns = columns
+        self.ids = columns["id"]
+        self.chunks = chunks
+        self.pool = pool
+        self.state = state
+        self._folded = None
+
+    @classmethod
+    def build(cls, state, pool=None):
+        pool = pool or StringPool()
+        rows = list(Job.objects.order_by("id").values_list(*LOAD_FIELDS))
+        columns, buffer = _columns_from_rows(rows, pool, 0)
+        return cls(columns, [buffer], pool, state)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def patched(self, rows, deleted_ids, state):
+        """
+        Return a new snapshot with rows (LOAD_FIELDS tuples) upserted and
+        deleted_ids dropped
+        """
+        delta, buffer = _columns_from_rows(rows, self.pool, len(self.chunks))
+        replaced = np.concatenate(
+            [delta["id"], np.asarray(deleted_ids, dtype=np.int64)]
+        )
+        keep = ~np.isin(self.ids, replaced)
+        merged = {
+            name: np.concatenate([column[keep], delta[name]])
+            for name, column in self.columns.items()
+        }
+        order = np.argsort(merged["id"], kind="stable")
+        merged = {name: column[order] for name, column in merged.items()}
+        catalog = JobCatalog(merged, self.chunks + [buffer], self.pool, state)
+        return catalog.compacted()
+
+    def compacted(self):
+        """
+        Copy live descriptions into one buffer once more than half of the
+        buffered text belongs to replaced or deleted jobs
+        """
+        live = int((self.columns["desc_end"] - self.columns["desc_start"]).sum())
+        if live * 2 >= sum(len(chunk) for chunk in self.chunks):
+            return self
+        descriptions = [self.description(row) for row in range(len(self))]
+        lengths = np.array([len(d) for d in descriptions], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        columns = {
+            **self.columns,
+            "desc_chunk": np.zeros(len(self), dtype=np.int32),
+            "desc_start": ends - lengths,
+            "desc_end": ends,
+        }
+        return JobCatalog(columns, ["".join(descriptions)], self.pool, self.state)
+
+    def description(self, row, limit=None):
+        start = int(self.columns["desc_start"][row])
+        end = int(self.columns["desc_end"][row])
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.chunks[self.columns["desc_chunk"][row]][start:end]
+
+    def _codes_for(self, value, fold=False):
+        if not fold:
+            code = self.pool.codes.get(value)
+            return [] if code is None else [code]
+        if self._folded is None:
+            folded = {}
+            for code, string in enumerate(self.pool.strings):
+                if isinstance(string, str):
+                    folded.setdefault(string.lower(), []).append(code)
+            self._folded = folded
+        return self._folded.get(value.lower(), [])
+
+    def filter(self, criteria):
+        """
+        Row positions (in id order) matching clean_job_filters() output,
+        with the same semantics as JobFilter
+        """
+        columns = self.columns
+        mask = np.ones(len(self), dtype=bool)
+        salary_min, salary_max = columns["salary_min"], columns["salary_max"]
+        if "min_salary" in criteria:
+            value = float(criteria["min_salary"])
+            mask &= (salary_max >= value) | (
+                np.isnan(salary_max) & ~np.isnan(salary_min)
+            )
+        if "max_salary" in criteria:
+            value = float(criteria["max_salary"])
+            mask &= (salary_min <= value) | (
+                np.isnan(salary_min) & ~np.isnan(salary_max)
+            )
+        if "salary_period" in criteria:
+            codes = self._codes_for(criteria["salary_period"])
+            mask &= np.isin(columns["salary_period"], codes)
+        if "city" in criteria:
+            # SQLite's NOCASE collation, which the city column uses
+            codes = self._codes_for(criteria["city"], fold=True)
+            mask &= np.isin(columns["city"], codes)
+        for name in ("region", "country"):
+            if name in criteria:
+                codes = self._codes_for(criteria[name].strip().upper())
+                mask &= np.isin(columns[name], codes)
+        if "remote" in criteria:
+            mask &= columns["is_remote"] == criteria["remote"]
+        return np.flatnonzero(mask)
+
+    def position(self, job_id):
+        """
+        Row position of job_id, or None
+        """
+        row = int(np.searchsorted(self.ids, job_id))
+        if row < len(self) and self.ids[row] == job_id:
+            return row
+        return None
+
+    def after(self, rows, last_id):
+        """
+        The rows (positions in id order) whose id is greater than last_id
+        """
+        return rows[self.ids[rows] > last_id]
+
+    def value(self, name, row):
+        column = self.columns[name]
+        if name in STRING_COLUMNS:
+            return self.pool.strings[column[row]]
+        if name in NUMBER_COLUMNS:
+            return None if math.isnan(column[row]) else int(column[row])
+        if name in DATETIME_COLUMNS:
+            return EPOCH + timedelta(microseconds=int(column[row]))
+        if name == "skills":
+            return [self.pool.strings[code] for code in column[row]]
+        if name == "is_remote":
+            return bool(column[row])
+        return int(column[row])
+
+    def project(self, rows, fields, description="full"):
+        """
+        Build the same dicts projection.project_jobs() reads from the
+        database, ready for serialize_job()
+        """
+        names = [name for name in fields if name != "description"]
+        if "id" not in names:
+            names.append("id")
+        results = []
+        for row in rows:
+            data = {name: self.value(name, row) for name in names}
+            if "description" in fields and description == "full":
+                data["description"] = self.description(row)
+            elif "description" in fields and description == "snippet":
+                data["description_snippet"] = self.description(row, SNIPPET_CHARS)
+                data["description_length"] = int(
+                    self.columns["desc_end"][row] - self.columns["desc_start"][row]
+                )
+            results.append(data)
+        return results
+
+
+def _catalog_changes(catalog):
+    """
+    Jobs updated since the snapshot was taken and the ids deleted since then
+    """
+    since = catalog.state["updated"]
+    jobs = Job.objects.order_by("id")
+    if since is not None:
+        # load_csv stamps a whole batch with one updated_at, so >= would
+        # re-read every job of the last batch each time
+        jobs = jobs.filter(updated_at__gt=since)
+    rows = list(jobs.values_list(*LOAD_FIELDS))
+    deleted = JobTombstone.objects.filter(
+        id__gt=catalog.state["tombstone_id"] or 0
+    ).values_list("job_id", flat=True)
+    return rows, list(deleted)
+
+
+def get_catalog(state):
+    """
+    Return this process's snapshot for the given catalog_state(), patching
+    it from the change feed or rebuilding it when the Job table has moved
+    """
+    global _catalog
+    with _lock:
+        catalog = _catalog
+        if catalog is not None and catalog.state == state:
+            return catalog
+        if catalog is None or catalog.state["updated"] is None:
+            catalog = JobCatalog.build(state)
+        else:
+            rows, deleted = _catalog_changes(catalog)
+            limit = settings.JOB_CATALOG_PATCH_MAX_FRACTION * max(len(catalog), 1)
+            if len(rows) + len(deleted) > limit:
+                catalog = JobCatalog.build(state)
+            else:
+                catalog = catalog.patched(rows, deleted, state)
+                if len(catalog) != state["count"]:
+                    # Deleted without a tombstone (e.g. a raw DELETE)
+                    catalog = JobCatalog.build(state)
+        _catalog = catalog
+        return catalog
+
+
+def get_catalog_job(request, job_id):
+    """
+    Return (catalog, row) for job_id when this process's snapshot holds the
+    version of the job the database has, else (None, None). Checked against
+    the updated_at the job ETag already read, so no catalog-wide queries
+    are needed once a snapshot exists.
+    """
+    updated_at = job_updated_at(request)
+    if updated_at is None:
+        return None, None
+    catalog = _catalog or get_catalog(catalog_state(request))
+    row = catalog.position(int(job_id))
+    if row is None or catalog.value("updated_at", row) != updated_at:
+        return None, None
+    return catalog, row
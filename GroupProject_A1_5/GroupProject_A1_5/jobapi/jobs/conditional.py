@@ -0,0 +1,109 @@
+"""
+ETag / Last-Modified validators for the job read endpoints, for use with
+django.views.decorators.http.condition. A repeat GET carrying the ETag or
+date from an earlier response gets a 304 without the view running.
+"""
+
+import functools
+import hashlib
+
+from django.db.models import Count, Max
+
+from .models import Job, JobTombstone
+
+# Bump when the payload format changes so clients don't keep stale bodies
+ETAG_VERSION = "1"
+
+
+def _fingerprint(*parts):
+    key = "\x1f".join(str(part) for part in parts)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _request_key(request):
+    """
+    The parameters that shape the response: the sorted query string
+    """
+    return _fingerprint(sorted(request.GET.lists()))
+
+
+def _reads_only(validator):
+    """
+    Skip the validator's queries for requests other than GET/HEAD, which
+    condition() would not answer with a 304 anyway
+    """
+
+    @functools.wraps(validator)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        return validator(request, *args, **kwargs)
+
+    return wrapper
+
+
+def catalog_state(request):
+    """
+    Count, newest id and newest change of the Job table, and the newest
+    tombstone so deletions also move the version. Cached on the request so
+    the ETag and Last-Modified callbacks share the two queries.
+    """
+    state = getattr(request, "_catalog_state", None)
+    if state is None:
+        state = Job.objects.aggregate(
+            count=Count("id"), max_id=Max("id"), updated=Max("updated_at")
+        )
+        state.update(
+            JobTombstone.objects.aggregate(
+                tombstone_id=Max("id"), deleted=Max("deleted_at")
+            )
+        )
+        request._catalog_state = state
+    return state
+
+
+@_reads_only
+def jobs_list_etag(request, *args, **kwargs):
+    state = catalog_state(request)
+    return _fingerprint(
+        ETAG_VERSION,
+        state["count"],
+        state["max_id"],
+        state["updated"],
+        state["tombstone_id"],
+        _request_key(request),
+    )
+
+
+@_reads_only
+def jobs_list_last_modified(request, *args, **kwargs):
+    state = catalog_state(request)
+    changes = [state["updated"], state["deleted"]]
+    return max((dt for dt in changes if dt), default=None)
+
+
+def job_updated_at(request):
+    if not hasattr(request, "_job_updated_at"):
+        try:
+            request._job_updated_at = (
+                Job.objects.filter(id=request.GET.get("job_id"))
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            request._job_updated_at = None
+    return request._job_updated_at
+
+
+@_reads_only
+def job_etag(request, *args, **kwargs):
+    updated_at = job_updated_at(request)
+    if updated_at is None:
+        # Unknown job: no validator, let the view produce its error
+        return None
+    return _fingerprint(ETAG_VERSION, updated_at, _request_key(request))
+
+
+@_reads_only
+def job_last_modified(request, *args, **kwargs):
+    return job_updated_at(request)
@@ -0,0 +1,242 @@
+"""
+Structured job data extraction with Groq, cached per normalized description.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .groq_client import GroqUnavailable, get_groq_client
+from .models import JobExtraction
+from .prompt_budget import normalize_text
+from .timing import phase
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_MODEL = "llama3-70b-8192"
+
+# Bump whenever the prompt text changes so cached extractions are not reused
+EXTRACTION_PROMPT_VERSION = "1"
+
+
+class ExtractionError(Exception):
+    """
+    Groq answered but no structured data came out; body and status are what
+    the API returns to the client
+    """
+
+    def __init__(self, body, status):
+        super().__init__(body["error"])
+        self.body = body
+        self.status = status
+
+
+def build_extraction_prompt(job_description):
+    return f"""
+You are an information extraction system.
+Given a job description, return ONLY a valid JSON object with the following fields:
+
+{{
+  "title": string,               // Exact official job title
+  "description": string,         // Cleaned job description
+  "salary": number,              // Minimum yearly salary if range exists, else 0
+  "experienceLevel": number,     // 0 = Entry-level/Fresher, 1 = Mid-level, 2 = Senior
+  "location": [string],          // Array of job locations
+  "jobType": string,             // Example: "Full-time", "Part-time", "Internship", "Contract"
+  "requirements": [string],      // Bullet points of qualifications/skills/experience
+  "company": string              // Main company name
+}}
+
+Rules:
+- Do not invent data. If missing, leave as 0, empty string, or empty array.
+- Output must be valid JSON only (starting with {{ and ending with }}).
+- Do not include metadata like djangoJobId, createdAt, updatedAt, applications, __v.
+- Only return extracted values from the description.
+
+Job Description:
+{job_description}
+"""
+
+
+def build_extraction_payload(job_description):
+    with phase("prompt"):
+        prompt = build_extraction_prompt(job_description)
+    return {
+        "model": EXTRACTION_MODEL,  # Using Llama 3 70B model for structured extraction
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.2,  # Lower temperature for more deterministic output
+        "max_tokens": 2048,
+    }
+
+
+def description_hash(job_description):
+    """
+    Hash a description so copies differing only in whitespace or HTML
+    entities share a cache entry. Case is kept: it can change what Groq
+    extracts (e.g. "Go" the language vs "go").
+    """
+    normalized = " ".join(normalize_text(job_description).split())
+    raw = "|".join([normalized, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def parse_extraction(content):
+    """
+    Parse Groq's reply, tolerating a ```json code fence around it
+    """
+    extracted_data = content.strip()
+    if extracted_data.startswith("```json"):
+        extracted_data = extracted_data[7:]
+    if extracted_data.endswith("```"):
+        extracted_data = extracted_data[:-3]
+    extracted_data = extracted_data.strip()
+    try:
+        return json.loads(extracted_data)
+    except json.JSONDecodeError as e:
+        raise ExtractionError(
+            {
+                "error": "Failed to parse extracted data as JSON",
+                "details": str(e),
+                "raw_data": extracted_data,
+            },
+            500,
+        )
+
+
+async def aextract(job_description):
+    """
+    Ask Groq for the structured fields of one description (no cache)
+    """
+    response = await get_groq_client().achat(
+        build_extraction_payload(job_description)
+    )
+    if response.status_code != 200:
+        raise ExtractionError(
+            {
+                "error": "Error from Groq API",
+                "status_code": response.status_code,
+                "response": response.text,
+            },
+            response.status_code,
+        )
+    try:
+        content = response.json()["choices"][0]["message"]["content"]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise ExtractionError(
+            {
+                "error": "Unexpected response from Groq API",
+                "details": repr(e),
+                "response": response.text,
+            },
+            502,
+        )
+    return parse_extraction(content)
+
+
+def get_cached_extractions(hashes):
+    """
+    Return {content_hash: data} for the hashes already extracted
+    """
+    entries = dict(
+        JobExtraction.objects.filter(content_hash__in=hashes).values_list(
+            "content_hash", "data"
+        )
+    )
+    if entries:
+        JobExtraction.objects.filter(content_hash__in=entries).update(
+            hits=F("hits") + 1, last_used_at=timezone.now()
+        )
+    return entries
+
+
+def store_extraction(content_hash, data):
+    JobExtraction.objects.update_or_create(
+        content_hash=content_hash,
+        defaults={
+            "model": EXTRACTION_MODEL,
+            "prompt_version": EXTRACTION_PROMPT_VERSION,
+            "data": data,
+        },
+    )
+
+
+async def aextract_job_data(job_description):
+    """
+    Return (data, cached) for one description, calling Groq only on a miss.
+    Raises ExtractionError or GroqUnavailable.
+    """
+    content_hash = description_hash(job_description)
+    cached = await sync_to_async(get_cached_extractions)([content_hash])
+    if content_hash in cached:
+        return cached[content_hash], True
+    data = await aextract(job_description)
+    await sync_to_async(store_extraction)(content_hash, data)
+    return data, False
+
+
+async def aextract_job_data_batch(descriptions):
+    """
+    Extract many descriptions: duplicates are collapsed, cached ones served
+    from JobExtraction, and the rest sent to Groq at most
+    EXTRACT_BATCH_CONCURRENCY at a time. Returns (results, stats) with one
+    result per input, in order.
+    """
+    hashes = [description_hash(description) for description in descriptions]
+    unique = {}
+    for content_hash, description in zip(hashes, descriptions):
+        unique.setdefault(content_hash, description)
+
+    cached = await sync_to_async(get_cached_extractions)(list(unique))
+    misses = [content_hash for content_hash in unique if content_hash not in cached]
+    semaphore = asyncio.Semaphore(settings.EXTRACT_BATCH_CONCURRENCY)
+
+    async def extract_one(content_hash):
+        async with semaphore:
+            try:
+                data = await aextract(unique[content_hash])
+            except ExtractionError as e:
+                return {**e.body, "status": e.status}
+            except GroqUnavailable as e:
+                return {"error": str(e), "status": 503}
+        await sync_to_async(store_extraction)(content_hash, data)
+        return {"data": data}
+
+    # One item failing in an unexpected way must not fail the whole batch
+    # and throw away what its siblings got from Groq
+    outcomes = await asyncio.gather(
+        *(extract_one(h) for h in misses), return_exceptions=True
+    )
+    extracted = {}
+    for content_hash, outcome in zip(misses, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(
+                "Batch extraction failed",
+                exc_info=outcome,
+                extra={"content_hash": content_hash},
+            )
+            outcome = {"error": f"Extraction failed: {outcome!r}", "status": 502}
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        extracted[content_hash] = outcome
+
+    results = []
+    for index, content_hash in enumerate(hashes):
+        if content_hash in cached:
+            result = {"cached": True, "data": cached[content_hash]}
+        else:
+            result = {"cached": False, **extracted[content_hash]}
+        results.append({"index": index, **result})
+    stats = {
+        "total": len(descriptions),
+        "unique": len(unique),
+        "cached": len(cached),
+        "extracted": sum("data" in result for result in extracted.values()),
+        "failed": sum("error" in result for result in extracted.values()),
+    }
+    return results, stats
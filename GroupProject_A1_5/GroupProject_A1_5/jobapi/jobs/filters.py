@@ -0,0 +1,92 @@
+"""
+Salary and location filters for the jobs endpoints, run as WHERE clauses
+on the indexed columns Job.save() and load_csv derive.
+"""
+
+import django_filters
+from django.db.models import Q
+
+from .models import Job
+from .normalize import PERIOD_ANNUAL_FACTORS
+
+# Query parameters JobFilter understands
+JOB_FILTER_PARAMS = (
+    "min_salary",
+    "max_salary",
+    "salary_period",
+    "city",
+    "region",
+    "country",
+    "remote",
+)
+
+
+class JobFilter(django_filters.FilterSet):
+    """
+    min_salary/max_salary are annual dollars and keep jobs whose advertised
+    range overlaps them; an open-ended range ("Up to", "From") counts on its
+    open side. Jobs with no parsed salary never pass a salary filter.
+    """
+
+    min_salary = django_filters.NumberFilter(method="filter_min_salary", min_value=0)
+    max_salary = django_filters.NumberFilter(method="filter_max_salary", min_value=0)
+    salary_period = django_filters.ChoiceFilter(
+        choices=[(period, period) for period in PERIOD_ANNUAL_FACTORS]
+    )
+    city = django_filters.CharFilter()
+    region = django_filters.CharFilter(method="filter_upper")
+    country = django_filters.CharFilter(method="filter_upper")
+    remote = django_filters.BooleanFilter(field_name="is_remote")
+
+    class Meta:
+        model = Job
+        fields = []
+
+    def filter_min_salary(self, queryset, name, value):
+        return queryset.filter(
+            Q(salary_max__gte=value)
+            | Q(salary_max__isnull=True, salary_min__isnull=False)
+        )
+
+    def filter_max_salary(self, queryset, name, value):
+        return queryset.filter(
+            Q(salary_min__lte=value)
+            | Q(salary_min__isnull=True, salary_max__isnull=False)
+        )
+
+    def filter_upper(self, queryset, name, value):
+        # Stored as upper-case codes; exact keeps the lookup on the index
+        return queryset.filter(**{name: value.strip().upper()})
+
+
+def _validated_filter(data, queryset=None):
+    job_filter = JobFilter(
+        {key: data[key] for key in JOB_FILTER_PARAMS if key in data}, queryset
+    )
+    if not job_filter.is_valid():
+        errors = "; ".join(
+            f"{field}: {' '.join(messages)}"
+            for field, messages in job_filter.errors.items()
+        )
+        raise ValueError(f"Invalid filter. {errors}")
+    return job_filter
+
+
+def filter_jobs(queryset, data):
+    """
+    Apply JobFilter to queryset; raise ValueError listing invalid parameters
+    """
+    return _validated_filter(data, queryset).qs
+
+
+def clean_job_filters(data):
+    """
+    Return the validated filter values that were given, for callers that
+    filter without the ORM (jobs.catalog)
+    """
+    cleaned = _validated_filter(data).form.cleaned_data
+    return {key: value for key, value in cleaned.items() if value not in (None, "")}
+
+
+def has_job_filters(data):
+    return any(data.get(key) not in (None, "") for key in JOB_FILTER_PARAMS)
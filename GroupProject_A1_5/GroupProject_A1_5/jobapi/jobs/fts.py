@@ -0,0 +1,148 @@
+"""
+SQLite FTS5 index over job title, company, location and description.
+
+jobs_job_fts is an external-content table: it stores only the index and
+reads column values from jobs_job. Triggers keep it in step with every
+INSERT/UPDATE/DELETE, including bulk_create/bulk_update and raw SQL.
+"""
+
+import re
+
+from django.db import connection
+
+FTS_TABLE = "jobs_job_fts"
+
+INSTALL_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, company, location, description,
+        content='jobs_job', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, company, location, description)
+        VALUES (new.id, new.title, new.company, new.location, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, location, description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, company, location, description ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, location, description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, company, location, description)
+        VALUES (new.id, new.title, new.company, new.location, new.description);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+UNINSTALL_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# bm25() column weights: title, company, location, description
+RANK_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+TERM_RE = re.compile(r"\w+")
+
+
+def install_fts(schema_editor):
+    """
+    Create (or re-create after a table remake dropped the triggers) the
+    index and rebuild it from jobs_job. SQLite only.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in INSTALL_SQL:
+        schema_editor.execute(sql)
+
+
+def uninstall_fts(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in UNINSTALL_SQL:
+        schema_editor.execute(sql)
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query: every word required, the last one as
+    a prefix so partially typed words still match. Quoting each term keeps
+    user input from being parsed as FTS5 syntax.
+    """
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _like(value):
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_jobs(text, location=None, job_type=None, limit=20, offset=0, within=None):
+    """
+    Return ranked matches as dicts with highlighted title and a description
+    snippet; best match first. within is an optional Job queryset (e.g. from
+    JobFilter) that results are restricted to, as an SQL subquery.
+    """
+    match_query = build_match_query(text)
+    if match_query is None:
+        return []
+
+    sql = [
+        f"""
+        SELECT j.id, j.title, j.company, j.location, j.job_type,
+               highlight({FTS_TABLE}, 0, '<mark>', '</mark>'),
+               snippet({FTS_TABLE}, 3, '<mark>', '</mark>', '…', 24),
+               bm25({FTS_TABLE}, %s, %s, %s, %s) AS score
+        FROM {FTS_TABLE}
+        JOIN jobs_job j ON j.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s
+        """
+    ]
+    params = [*RANK_WEIGHTS, match_query]
+    if location:
+        sql.append("AND j.location LIKE %s ESCAPE '\\'")
+        params.append(_like(location))
+    if job_type:
+        sql.append("AND j.job_type LIKE %s ESCAPE '\\'")
+        params.append(_like(job_type))
+    if within is not None:
+        subquery, subquery_params = within.values("id").query.sql_with_params()
+        sql.append(f"AND j.id IN ({subquery})")
+        params.extend(subquery_params)
+    sql.append("ORDER BY score LIMIT %s OFFSET %s")
+    params.extend([limit, offset])
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        rows = cursor.fetchall()
+    return [
+        {
+            "id": row[0],
+            "title": row[1],
+            "company": row[2],
+            "location": row[3],
+            "job_type": row[4],
+            "title_highlight": row[5],
+            "snippet": row[6],
+            # bm25() is lower-is-better; flip it so higher means more relevant
+            "score": round(-row[7], 4),
+        }
+        for row in rows
+    ]
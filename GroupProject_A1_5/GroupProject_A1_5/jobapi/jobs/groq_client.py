@@ -0,0 +1,443 @@
+"""
+Shared HTTP client for the Groq chat completions API.
+
+One pooled requests.Session per process keeps TLS connections alive between
+calls. Every call goes through a token bucket sized to our Groq quota and a
+circuit breaker, and 429/5xx/connection errors are retried with jittered
+exponential backoff. Point GROQ_API_BASE at a local server to test without
+Groq.
+
+The async methods (apost/achat) share the limiter and breaker with the
+sync ones but send through an httpx.AsyncClient, so async views can keep
+many calls in flight on one event loop.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .timing import phase
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class GroqError(Exception):
+    pass
+
+
+class GroqUnavailable(GroqError):
+    """
+    Groq could not be reached: the circuit is open, the rate limiter timed
+    out, or every retry failed at the connection level
+    """
+
+
+class TokenBucket:
+    """
+    Allow rate calls per second on average with bursts of up to capacity
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, timeout=None):
+        """
+        Claim the next token without blocking and return how many seconds
+        to wait before using it, or None (claiming nothing) if that would be
+        longer than timeout. Callers are served in the order they reserve.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def acquire(self, timeout=None):
+        """
+        Take a token, sleeping until it is due; False if that would take
+        longer than timeout seconds
+        """
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        time.sleep(wait)
+        return True
+
+    async def acquire_async(self, timeout=None):
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Open after failure_threshold consecutive failures and reject calls for
+    reset_timeout seconds, then let one trial call through (half-open)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise GroqUnavailable("Groq circuit is open; failing fast.")
+                self.state = self.HALF_OPEN
+            elif self.state == self.HALF_OPEN:
+                # A trial call is already in flight
+                raise GroqUnavailable("Groq circuit is half-open; failing fast.")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def abandon_trial(self):
+        """
+        A call was cancelled before Groq answered; if it was the half-open
+        trial, the next call makes another one
+        """
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+
+class GroqClient:
+    def __init__(
+        self,
+        base_url=None,
+        api_key=None,
+        timeout=None,
+        max_retries=None,
+        backoff=None,
+        backoff_max=None,
+        requests_per_minute=None,
+        burst=None,
+        failure_threshold=None,
+        reset_timeout=None,
+        pool_size=None,
+    ):
+        self.base_url = (base_url or settings.GROQ_API_BASE).rstrip("/")
+        self._api_key = api_key
+        self.timeout = timeout or settings.GROQ_TIMEOUT
+        self.max_retries = (
+            settings.GROQ_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff = settings.GROQ_RETRY_BACKOFF if backoff is None else backoff
+        self.backoff_max = backoff_max or settings.GROQ_RETRY_BACKOFF_MAX
+        rpm = requests_per_minute or settings.GROQ_REQUESTS_PER_MINUTE
+        self.limiter = TokenBucket(rpm / 60, burst or settings.GROQ_RATE_BURST)
+        self.breaker = CircuitBreaker(
+            failure_threshold or settings.GROQ_CIRCUIT_FAILURES,
+            reset_timeout or settings.GROQ_CIRCUIT_RESET_SECONDS,
+        )
+        pool_size = pool_size or settings.GROQ_MAX_CONCURRENCY
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # httpx clients are tied to the loop they were created on; runserver
+        # runs each async view on a fresh loop, ASGI servers on one. Each
+        # entry is dropped and its client closed when its loop shuts down.
+        self._async_clients = {}
+
+    @property
+    def api_key(self):
+        # Read per call so a key loaded from .env after startup is picked up
+        return self._api_key or os.getenv("GROQ_API_KEY")
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = None
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+
+    def _url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _record_response(self, response):
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            # A 429 means Groq is up but busy; it doesn't trip the breaker
+            self.breaker.record_success()
+
+    def post(self, path, payload, timeout=None):
+        """
+        POST JSON to base_url + path and return the final requests.Response.
+
+        429/5xx responses are retried; if they persist the last one is
+        returned for the caller to report. Raises GroqUnavailable when no
+        response could be had at all.
+        """
+        timeout = timeout or self.timeout
+        url = self._url(path)
+        headers = self._headers()
+        for attempt in range(self.max_retries + 1):
+            # Wait for the limiter first: a half-open trial must not be
+            # left hanging by a limiter timeout
+            if not self.limiter.acquire(timeout=settings.GROQ_RATE_LIMIT_WAIT):
+                raise GroqUnavailable("Groq rate limit reached; try again later.")
+            self.breaker.before_call()
+            try:
+                response = self.session.post(
+                    url, headers=headers, json=payload, timeout=timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise GroqUnavailable(f"Could not reach Groq: {e}") from e
+                time.sleep(self._retry_delay(attempt))
+                continue
+            except BaseException:
+                # Anything else (a broken chunked body, ...) still has to
+                # settle the call, or a half-open breaker stays half-open
+                self.breaker.record_failure()
+                raise
+
+            self._record_response(response)
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == self.max_retries
+            ):
+                return response
+            time.sleep(self._retry_delay(attempt, response))
+
+    def chat(self, payload, timeout=None):
+        with phase("groq"):
+            return self.post("chat/completions", payload, timeout=timeout)
+
+    async def _async_client(self):
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            connect, read = self.timeout
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(
+                    max_connections=settings.GROQ_ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GROQ_MAX_CONCURRENCY,
+                ),
+            )
+            entry = self._async_clients[loop] = (client, self._close_with(loop))
+            await anext(entry[1])
+        return entry[0]
+
+    async def _close_with(self, loop):
+        """
+        Suspended until loop shuts down its async generators, as asyncio.run()
+        does on exit, then closes loop's client
+        """
+        try:
+            yield
+        finally:
+            client, _ = self._async_clients.pop(loop)
+            await client.aclose()
+
+    async def apost(self, path, payload, timeout=None):
+        """
+        Async post(): same retries, limiter and breaker; returns an
+        httpx.Response
+        """
+        if timeout is not None:
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout,) * 2
+            timeout = httpx.Timeout(read, connect=connect)
+        else:
+            timeout = httpx.USE_CLIENT_DEFAULT
+        client = await self._async_client()
+        url = self._url(path)
+        headers = self._headers()
+        for attempt in range(self.max_retries + 1):
+            if not await self.limiter.acquire_async(
+                timeout=settings.GROQ_RATE_LIMIT_WAIT
+            ):
+                raise GroqUnavailable("Groq rate limit reached; try again later.")
+            self.breaker.before_call()
+            try:
+                response = await client.post(
+                    url, headers=headers, json=payload, timeout=timeout
+                )
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise GroqUnavailable(f"Could not reach Groq: {e!r}") from e
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+            except asyncio.CancelledError:
+                # The client went away; that says nothing about Groq
+                self.breaker.abandon_trial()
+                raise
+            except BaseException:
+                self.breaker.record_failure()
+                raise
+
+            self._record_response(response)
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == self.max_retries
+            ):
+                return response
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    async def achat(self, payload, timeout=None):
+        with phase("groq"):
+            return await self.apost("chat/completions", payload, timeout=timeout)
+
+    async def astream_chat(self, payload):
+        """
+        Stream a chat completion, yielding content deltas as Groq sends them.
+
+        Retries happen only before the first byte; once tokens are flowing a
+        dropped connection raises GroqUnavailable. Non-200 answers raise
+        GroqError with Groq's response body.
+        """
+        client = await self._async_client()
+        url = self._url("chat/completions")
+        headers = self._headers()
+        payload = {**payload, "stream": True}
+        streaming = False
+        for attempt in range(self.max_retries + 1):
+            if not await self.limiter.acquire_async(
+                timeout=settings.GROQ_RATE_LIMIT_WAIT
+            ):
+                raise GroqUnavailable("Groq rate limit reached; try again later.")
+            self.breaker.before_call()
+            try:
+                async with client.stream(
+                    "POST", url, headers=headers, json=payload
+                ) as response:
+                    self._record_response(response)
+                    if (
+                        response.status_code in RETRY_STATUSES
+                        and attempt < self.max_retries
+                    ):
+                        delay = self._retry_delay(attempt, response)
+                    elif response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        raise GroqError(
+                            f"Groq returned {response.status_code}: {body}"
+                        )
+                    else:
+                        streaming = True
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:") :].strip()
+                            if data == "[DONE]":
+                                return
+                            content = _stream_chunk_content(data)
+                            if content:
+                                yield content
+                        return
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if streaming or attempt == self.max_retries:
+                    raise GroqUnavailable(f"Could not reach Groq: {e!r}") from e
+                delay = self._retry_delay(attempt)
+            except GroqError:
+                # Raised after _record_response() has settled the breaker
+                raise
+            except (asyncio.CancelledError, GeneratorExit):
+                # Cancelled, or the consumer stopped reading
+                self.breaker.abandon_trial()
+                raise
+            except BaseException:
+                self.breaker.record_failure()
+                raise
+            await asyncio.sleep(delay)
+
+
+def _stream_chunk_content(data):
+    """
+    Content delta of one streamed chunk's JSON, or None for chunks without
+    choices (e.g. a final usage-only chunk). Raises GroqError for anything
+    that isn't a well-formed chunk.
+    """
+    try:
+        chunk = json.loads(data)
+        if chunk.get("error"):
+            raise GroqError(f"Groq stream error: {chunk['error']}")
+        choices = chunk.get("choices")
+        if not choices:
+            return None
+        return (choices[0].get("delta") or {}).get("content")
+    except (ValueError, AttributeError, TypeError) as e:
+        raise GroqError(f"Malformed stream chunk from Groq: {data[:200]}") from e
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """
+    Return this process's shared client, creating it on first use
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GroqClient()
+        return _client
+
+
+def reset_groq_client():
+    """
+    Drop the shared client so the next call picks up changed settings
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.session.close()
+        _client = None
@@ -0,0 +1,102 @@
+"""
+CSV parsing for the scraped job files in output/.
+
+Kept free of model imports so it can run in worker processes that haven't
+set Django up.
+"""
+
+import ast
+import csv
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from .normalize import NORMALIZED_FIELDS, normalized_job_fields
+
+# Seniority and years-of-experience tags aren't skills
+NON_SKILL_RE = re.compile(
+    r"^(under )?\d+\+? years?$|^(senior|mid|entry)[ -]level$", re.I
+)
+
+# Job fields written by the loader, i.e. everything except date_posted
+JOB_FIELDS = [
+    "title",
+    "company",
+    "location",
+    "url",
+    "salary",
+    "job_type",
+    "description",
+    "skills",
+] + NORMALIZED_FIELDS
+
+
+def parse_qualifications(value):
+    """
+    Turn the scraped "['React', 'Node.js', ...]" column into a list of skills
+    """
+    try:
+        items = ast.literal_eval(value) if value else []
+    except (ValueError, SyntaxError):
+        return []
+    skills = [item.strip() for item in items if isinstance(item, str)]
+    return [skill for skill in skills if skill and not NON_SKILL_RE.match(skill)]
+
+
+def normalize_row(row):
+    """
+    Map a scraped CSV row onto Job field values
+    """
+    job = {
+        "title": row.get("title", "").strip(),
+        "company": row.get("company", "").strip(),
+        "location": row.get("place", "").strip(),
+        "url": row.get("url", "").strip(),
+        "salary": row.get("salary", "").strip(),
+        "job_type": row.get("job_type", "").strip(),
+        "description": row.get("description", ""),
+        "skills": parse_qualifications(row.get("qualifications", "")),
+    }
+    # bulk_create/bulk_update bypass Job.save(), so derive these here too
+    job.update(normalized_job_fields(job["salary"], job["location"]))
+    return job
+
+
+def iter_csv_jobs(path):
+    """
+    Stream normalized job dicts from one CSV file
+    """
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        for row in csv.DictReader(csvfile):
+            yield normalize_row(row)
+
+
+def normalize_url(url):
+    """
+    Drop the query string and fragment, which carry tracking parameters that
+    differ between searches for the same posting
+    """
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+
+
+def row_fingerprint(row):
+    """
+    Identify a posting across files by its normalized URL, title and company
+    """
+    key = "\x1f".join(
+        [
+            normalize_url(row["url"]),
+            " ".join(row["title"].lower().split()),
+            " ".join(row["company"].lower().split()),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def parse_csv_file(path):
+    """
+    Parse a whole CSV file into (fingerprint, job dict) pairs; used as a
+    process pool task
+    """
+    return [(row_fingerprint(row), row) for row in iter_csv_jobs(path)]
@@ -1,12 +1,263 @@
+import json
+import time
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Q
 from django.http import JsonResponse
-from .models import Job
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+from .catalog import get_catalog_job
+from .conditional import job_etag, job_last_modified
+from .filters import filter_jobs, has_job_filters
+from .fts import search_jobs as fts_search_jobs
+from .models import Job, JobTombstone, Resume
+from .pagination import decode_change_cursor, encode_change_cursor
+from .projection import (
+    JOB_PAYLOAD_FIELDS,
+    parse_description_mode,
+    parse_fields,
+    project_jobs,
+    serialize_job,
+)
+from .resume_text import get_resume_text
+from .search_index import shortlist_jobs
+from .skills import get_skill_matrix
 
 
+@cache_control(no_cache=True)
+@condition(etag_func=job_etag, last_modified_func=job_last_modified)
 def get_job(request):
+    """
+    Return a job as formatted text, or as a JSON object when fields or
+    description (full|snippet|none) is given. Revalidating with the ETag or
+    Last-Modified of an earlier response returns 304 while the job is unchanged.
+    """
     job_id = request.GET.get("job_id")
+    catalog, row = None, None
+    if settings.JOB_CATALOG_SNAPSHOT:
+        catalog, row = get_catalog_job(request, job_id)
+    if "fields" in request.GET or "description" in request.GET:
+        try:
+            fields = parse_fields(request.GET.get("fields"), JOB_PAYLOAD_FIELDS)
+            description = parse_description_mode(request.GET.get("description"))
+            if row is not None:
+                data = catalog.project([row], fields, description)[0]
+            else:
+                data = project_jobs(
+                    Job.objects.filter(id=job_id), fields, description
+                ).get()
+        except Job.DoesNotExist:
+            return JsonResponse({"error": "Job not found."}, status=404)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse({"job": serialize_job(data, fields, description)})
+    text_fields = ["title", "company", "location", "description"]
     try:
-        job = Job.objects.get(id=job_id)
-        text = f"Title: {job.title}\nCompany: {job.company}\nLocation: {job.location}\n\nDescription:\n{job.description}"
+        if row is not None:
+            job = catalog.project([row], text_fields)[0]
+        else:
+            job = Job.objects.filter(id=job_id).values(*text_fields).get()
+        text = f"Title: {job['title']}\nCompany: {job['company']}\nLocation: {job['location']}\n\nDescription:\n{job['description']}"
     except Exception as e:
         text = f"Error: {str(e)}"
     return JsonResponse({"text": text})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def shortlist_jobs_for_resume(request):
+    """
+    Rank jobs against a resume's text with the local BM25 index, so only the
+    top_k need to go through the Groq match
+    """
+    try:
+        data = json.loads(request.body)
+        top_k = int(data.get("top_k", 10))
+        if top_k < 1:
+            return JsonResponse(
+                {"error": "top_k must be a positive integer."}, status=400
+            )
+        resume = Resume.objects.get(id=data.get("resume_id"))
+        resume_text = get_resume_text(resume)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    start = time.perf_counter()
+    ranked = shortlist_jobs(resume_text, top_k)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    jobs = Job.objects.only("id", "title", "company", "location").in_bulk(
+        [job_id for job_id, _ in ranked]
+    )
+    results = [
+        {
+            "id": job_id,
+            "title": jobs[job_id].title,
+            "company": jobs[job_id].company,
+            "location": jobs[job_id].location,
+            "score": round(score, 4),
+        }
+        for job_id, score in ranked
+        if job_id in jobs
+    ]
+    return JsonResponse({"jobs": results, "took_ms": round(took_ms, 2)})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def skill_rank_jobs(request):
+    """
+    Deterministically rank every job by how many of its listed skills appear
+    in the resume (0-100, like the Groq rank)
+    """
+    try:
+        data = json.loads(request.body)
+        top_k = int(data.get("top_k", 10))
+        if top_k < 1:
+            return JsonResponse(
+                {"error": "top_k must be a positive integer."}, status=400
+            )
+        resume = Resume.objects.get(id=data.get("resume_id"))
+        resume_text = get_resume_text(resume)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    start = time.perf_counter()
+    ranked = get_skill_matrix().rank(resume_text, top_k)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    jobs = Job.objects.only("id", "title", "company").in_bulk(
+        [job_id for job_id, *_ in ranked]
+    )
+    results = [
+        {
+            "id": job_id,
+            "title": jobs[job_id].title,
+            "company": jobs[job_id].company,
+            "skill_rank": round(score * 100),
+            "matched_skills": matched,
+            "missing_skills": missing,
+        }
+        for job_id, score, matched, missing in ranked
+        if job_id in jobs
+    ]
+    return JsonResponse({"jobs": results, "took_ms": round(took_ms, 2)})
+
+
+def job_changes(request):
+    """
+    Incremental feed for mirrors of the job catalog.
+
+    GET ?cursor=<next_cursor>&limit=n returns jobs inserted or updated and
+    ids of jobs deleted since the cursor. Omit the cursor for a full sync,
+    then keep passing back next_cursor; has_more means call again straight
+    away. Apply "upserted" before "deleted".
+    """
+    try:
+        updated_at, last_id, last_tombstone = decode_change_cursor(
+            request.GET.get("cursor")
+        )
+        limit = int(request.GET.get("limit", 500))
+        if limit < 1:
+            return JsonResponse(
+                {"error": "limit must be a positive integer."}, status=400
+            )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if last_tombstone is None:
+        # A full sync has nothing to delete yet. Read the newest tombstone
+        # before the jobs so a delete racing with this request isn't lost.
+        last_tombstone = JobTombstone.objects.aggregate(last=Max("id"))["last"] or 0
+
+    jobs = Job.objects.order_by("updated_at", "id")
+    if updated_at is not None:
+        jobs = jobs.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=last_id)
+        )
+    jobs = list(jobs[: limit + 1])
+
+    tombstones = list(
+        JobTombstone.objects.filter(id__gt=last_tombstone)
+        .order_by("id")
+        .values_list("id", "job_id")[: limit + 1]
+    )
+
+    has_more = len(jobs) > limit or len(tombstones) > limit
+    jobs = jobs[:limit]
+    tombstones = tombstones[:limit]
+
+    if jobs:
+        updated_at, last_id = jobs[-1].updated_at, jobs[-1].pk
+    if tombstones:
+        last_tombstone = tombstones[-1][0]
+
+    return JsonResponse(
+        {
+            "upserted": [
+                {
+                    "id": job.pk,
+                    "title": job.title,
+                    "company": job.company,
+                    "location": job.location,
+                    "url": job.url,
+                    "salary": job.salary,
+                    "job_type": job.job_type,
+                    "description": job.description,
+                    "skills": job.skills,
+                    "date_posted": job.date_posted.isoformat(),
+                    "updated_at": job.updated_at.isoformat(),
+                }
+                for job in jobs
+            ],
+            "deleted": [job_id for _, job_id in tombstones],
+            "next_cursor": encode_change_cursor(updated_at, last_id, last_tombstone),
+            "has_more": has_more,
+        }
+    )
+
+
+def search_jobs(request):
+    """
+    Full-text job search.
+
+    GET ?q=...&location=...&job_type=...&limit=20&offset=0 returns jobs
+    ranked by relevance (title matches weigh most) with <mark>-highlighted
+    titles and description snippets. The JobFilter parameters (min_salary,
+    max_salary, salary_period, city, region, country, remote) narrow it
+    further.
+    """
+    if connection.vendor != "sqlite":
+        return JsonResponse(
+            {"error": "Full-text search requires the SQLite FTS5 backend."},
+            status=501,
+        )
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "q is required."}, status=400)
+    try:
+        limit = int(request.GET.get("limit", 20))
+        offset = int(request.GET.get("offset", 0))
+        if limit < 1 or offset < 0:
+            raise ValueError
+    except ValueError:
+        return JsonResponse(
+            {"error": "limit must be positive and offset non-negative."}, status=400
+        )
+    within = None
+    if has_job_filters(request.GET):
+        try:
+            within = filter_jobs(Job.objects.all(), request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    results = fts_search_jobs(
+        query,
+        location=request.GET.get("location"),
+        job_type=request.GET.get("job_type"),
+        limit=min(limit, 100),
+        offset=offset,
+        within=within,
+    )
+    return JsonResponse({"jobs": results, "limit": limit, "offset": offset})
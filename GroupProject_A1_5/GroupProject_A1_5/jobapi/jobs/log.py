@@ -0,0 +1,69 @@
+"""
+Structured, non-blocking logging for the jobs app (wired up in
+settings.LOGGING).
+
+Request threads only put records on a queue; a background listener thread
+formats them as one JSON object per line and writes them to stderr, so a
+slow terminal or log pipe never holds up a request.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through extra=
+RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRS
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    QueueHandler with its own listener thread writing to stderr. The
+    formatter set through dictConfig is applied on the listener thread.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge args and render tracebacks now, while they are still valid,
+        # but leave the formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
@@ -0,0 +1,231 @@
+# jobs/management/commands/benchmark_api.py
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.test.utils import override_settings
+from jobs.benchmark import (
+    GROQ_PROFILES,
+    FakeGroqServer,
+    QueryCountingApp,
+    compare,
+    run_load,
+    summarize,
+)
+from jobs.groq_client import reset_groq_client
+
+ENDPOINTS = ('paginated_jobs', 'find_jobs', 'match_resume_job', 'extract_job_data')
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the jobs API against a throwaway database seeded from output/ and '
+        'resumes/, with a local Groq stand-in, and report latency percentiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--groq-profile', choices=sorted(GROQ_PROFILES), default='fast',
+                            help='Latency/error preset for the Groq stand-in')
+        parser.add_argument('--groq-latency', type=float, help='Override the profile latency (seconds)')
+        parser.add_argument('--groq-error-rate', type=float,
+                            help='Override the share of Groq calls that fail with 429/5xx')
+        parser.add_argument('--groq-rpm', type=int, default=100000,
+                            help='GROQ_REQUESTS_PER_MINUTE during the run (high so the limiter '
+                                 "doesn't dominate)")
+        parser.add_argument('--csv-folder', default='output', help='CSV files to seed jobs from')
+        parser.add_argument('--resumes', default='resumes', help='PDF resumes to seed')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved baseline')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed fractional slowdown before a metric counts as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when the baseline comparison finds regressions')
+
+    def handle(self, *args, **options):
+        latency, error_rate = GROQ_PROFILES[options['groq_profile']]
+        if options['groq_latency'] is not None:
+            latency = options['groq_latency']
+        if options['groq_error_rate'] is not None:
+            error_rate = options['groq_error_rate']
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        workdir = tempfile.mkdtemp(prefix='jobapi-bench-')
+        groq = FakeGroqServer(latency=latency, error_rate=error_rate).start()
+        os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+        overrides = override_settings(
+            GROQ_API_BASE=groq.base_url,
+            GROQ_REQUESTS_PER_MINUTE=options['groq_rpm'],
+            GROQ_RATE_BURST=options['concurrency'],
+            PDF_TEXT_CACHE_DIR=os.path.join(workdir, 'pdf_text'),
+            JOB_INDEX_PATH=os.path.join(workdir, 'job_index.pickle'),
+            ALLOWED_HOSTS=['*'],
+        )
+        db_settings = connection.settings_dict
+        db_settings.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        old_name = db_settings['NAME']
+        # Per-request info logs would drown the report
+        jobs_logger = logging.getLogger('jobs')
+        log_level = jobs_logger.level
+        jobs_logger.setLevel(logging.WARNING)
+        overrides.enable()
+        try:
+            reset_groq_client()
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                fixtures = self.seed(options)
+            results = self.run(options, fixtures)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            overrides.disable()
+            reset_groq_client()
+            groq.stop()
+            jobs_logger.setLevel(log_level)
+
+        self.report(results, groq.calls, latency, error_rate)
+        payload = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'groq_latency': latency,
+                'groq_error_rate': error_rate,
+                'jobs': len(fixtures['jobs']),
+                'resumes': len(fixtures['resumes']),
+            },
+            'endpoints': results,
+        }
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(payload, f, indent=2)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            for endpoint, metric, before, after in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f'Regression: {endpoint} {metric} {before} -> {after}'
+                ))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(
+                    f"No regressions against {options['baseline']} "
+                    f"(tolerance {options['tolerance']:.0%})"
+                ))
+            elif options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} metric(s) regressed.')
+
+    def seed(self, options):
+        from jobs.models import Job, Resume
+
+        call_command('load_csv', folder=options['csv_folder'], workers=1)
+        folder = options['resumes']
+        names = sorted(name for name in os.listdir(folder) if name.lower().endswith('.pdf'))
+        if not names:
+            raise CommandError(f'No PDF resumes in {folder}.')
+        # Resume.file paths are relative to MEDIA_ROOT, i.e. the project folder
+        resumes = Resume.objects.bulk_create(
+            [Resume(file=os.path.relpath(os.path.join(folder, name))) for name in names]
+        )
+        jobs = list(Job.objects.order_by('id').values('id', 'title', 'company', 'description'))
+        if not jobs:
+            raise CommandError(f"No jobs loaded from {options['csv_folder']}.")
+        pdfs = {}
+        for resume in resumes:
+            with open(resume.file.path, 'rb') as f:
+                pdfs[resume.pk] = (os.path.basename(resume.file.name), f.read())
+        return {'jobs': jobs, 'resumes': [resume.pk for resume in resumes], 'pdfs': pdfs}
+
+    def requests_for(self, fixtures):
+        jobs, resumes, pdfs = fixtures['jobs'], fixtures['resumes'], fixtures['pdfs']
+        pages = max(len(jobs) // 20, 1)
+
+        def paginated_jobs(session, base, i):
+            return session.get(
+                f'{base}/api/paginated_jobs/',
+                params={'page_no': i % pages + 1, 'page_size': 20},
+            )
+
+        def find_jobs(session, base, i):
+            # Cycling through jobs means each (resume, job) pair starts cold
+            return session.post(f'{base}/api/find_jobs/', json={
+                'resume_id': resumes[i % len(resumes)],
+                'job_id': jobs[i % len(jobs)]['id'],
+            })
+
+        def match_resume_job(session, base, i):
+            name, content = pdfs[resumes[i % len(resumes)]]
+            return session.post(
+                f'{base}/api/match_resume_job/',
+                data={'job_description': jobs[i % len(jobs)]['description']},
+                files={'resume': (name, content, 'application/pdf')},
+            )
+
+        def extract_job_data(session, base, i):
+            return session.post(
+                f'{base}/api/extract_job_data/',
+                json={'description': jobs[i % len(jobs)]['description']},
+            )
+
+        return {
+            'paginated_jobs': paginated_jobs,
+            'find_jobs': find_jobs,
+            'match_resume_job': match_resume_job,
+            'extract_job_data': extract_job_data,
+        }
+
+    def run(self, options, fixtures):
+        app = QueryCountingApp(WSGIHandler())
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+        server.daemon_threads = True
+        server.set_app(app)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        makers = self.requests_for(fixtures)
+        results = {}
+        try:
+            for endpoint in options['endpoints']:
+                self.stdout.write(f"Running {endpoint}: {options['requests']} requests, "
+                                  f"{options['concurrency']} concurrent...")
+                latencies, errors, wall = run_load(
+                    base, makers[endpoint], options['requests'], options['concurrency'],
+                )
+                queries = app.counts.get(f'/api/{endpoint}/', [])
+                results[endpoint] = summarize(latencies, errors, wall, queries)
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def report(self, results, groq_calls, latency, error_rate):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'endpoint':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} "
+            f"{'errors':>7} {'queries':>8}"
+        )
+        for endpoint, r in results.items():
+            self.stdout.write(
+                f"{endpoint:<18} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                f"{r['rps']:>8.1f} {r['errors']:>7} {r['queries_mean']:>8.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Groq stand-in: {groq_calls} calls at ~{latency * 1000:.0f} ms, '
+            f'{error_rate:.0%} errors'
+        ))
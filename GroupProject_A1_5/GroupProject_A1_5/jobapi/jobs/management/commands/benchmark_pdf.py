@@ -0,0 +1,59 @@
+# jobs/management/commands/benchmark_pdf.py
+import os
+import time
+from django.core.management.base import BaseCommand
+from jobs.utils import PDF_ENGINES, _extract_page_range, _get_page_executor, iter_pdf_pages
+
+
+class Command(BaseCommand):
+    help = 'Compare serial and page-parallel PDF text extraction on resumes/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='PDF files or folders (default: resumes/)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per file and mode')
+        parser.add_argument('--engine', choices=sorted(PDF_ENGINES), default='pdfplumber',
+                            help='Text engine to time (default: pdfplumber)')
+
+    def handle(self, *args, **options):
+        files = []
+        for path in options['paths'] or ['resumes']:
+            if os.path.isdir(path):
+                files.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path))
+                    if name.lower().endswith('.pdf')
+                )
+            else:
+                files.append(path)
+
+        if not files:
+            self.stdout.write(self.style.WARNING('No PDF files found.'))
+            return
+
+        # Start the pool before timing so worker spawn cost isn't attributed to one file
+        engine = PDF_ENGINES[options['engine']]
+        _get_page_executor().submit(_extract_page_range, engine.name, files[0], 0, 1).result()
+
+        totals = {'serial': 0.0, 'parallel': 0.0}
+        self.stdout.write(f"{'file':<40} {'pages':>5} {'serial ms':>10} {'parallel ms':>12}")
+        for path in files:
+            timings = {}
+            pages = 0
+            for mode in ('serial', 'parallel'):
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    pages = len(list(iter_pdf_pages(path, parallel=mode == 'parallel', engine=engine)))
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[mode] = best
+                totals[mode] += best
+            self.stdout.write(
+                f"{os.path.basename(path)[:40]:<40} {pages:>5} "
+                f"{timings['serial'] * 1000:>10.1f} {timings['parallel'] * 1000:>12.1f}"
+            )
+
+        speedup = totals['serial'] / totals['parallel'] if totals['parallel'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Total serial {totals['serial'] * 1000:.1f} ms, "
+            f"parallel {totals['parallel'] * 1000:.1f} ms ({speedup:.2f}x)"
+        ))
@@ -1,29 +1,149 @@
 # jobs/management/commands/load_csv.py
+import multiprocessing
 import os
-import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from jobs import skills
+from jobs.ingest import JOB_FIELDS, parse_csv_file
 from jobs.models import Job
-from datetime import datetime
+from jobs.search_index import deferred_index_updates
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class Command(BaseCommand):
-    help = 'Load jobs from CSV files in output/'
-
-    def handle(self, *args, **kwargs):
-        Job.objects.all().delete()
-        folder = 'output'
-        for filename in os.listdir(folder):
-            if filename.endswith('.csv'):
-                with open(os.path.join(folder, filename), newline='', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    for row in reader:
-                        Job.objects.create(
-                            title=row.get('title', ''),
-                            company=row.get('company', ''),
-                            location=row.get('place', ''),
-                            url=row.get('url', ''),
-                            salary=row.get('salary', ''),
-                            job_type=row.get('job_type', ''),
-                            description=row.get('description', ''),
-                            date_posted=datetime.now(),
-                        )
-        self.stdout.write(self.style.SUCCESS('✅ Job data loaded successfully.'))
+    help = 'Load jobs from CSV files in output/, upserting by job URL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--folder', default='output', help='Folder containing the CSV files')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk write transaction')
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete jobs that are not in any CSV file')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used to parse CSV files (1 parses in this process)')
+
+    def handle(self, *args, **options):
+        folder = options['folder']
+        paths = [
+            os.path.join(folder, filename) for filename in sorted(os.listdir(folder))
+            if filename.endswith('.csv')
+        ]
+        self.stats = {
+            'rows': 0, 'duplicates': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0,
+        }
+        seen_urls, seen_no_url = set(), set()
+
+        start = time.perf_counter()
+        workers = min(options['workers'], len(paths))
+        # The search index is updated once at the end rather than per row, and
+        # only for the jobs that changed
+        with deferred_index_updates() as changed_ids, ProcessPoolExecutor(
+            max_workers=max(workers, 1), mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            if workers > 1:
+                # map() hands files back in order, so dedupe keeps the same winner
+                parsed_files = executor.map(parse_csv_file, paths)
+            else:
+                parsed_files = (parse_csv_file(path) for path in paths)
+            for batch in batched(self.dedupe(parsed_files), options['batch_size']):
+                urls, no_url_ids, written_ids = self.write_batch(batch)
+                seen_urls.update(urls)
+                seen_no_url.update(no_url_ids)
+                changed_ids.update(written_ids)
+            if options['prune']:
+                stale = Job.objects.exclude(url__in=seen_urls).exclude(
+                    url='', id__in=seen_no_url,
+                )
+                self.stats['deleted'] = stale.delete()[1].get('jobs.Job', 0)
+        if changed_ids:
+            skills.invalidate()
+        elapsed = time.perf_counter() - start
+
+        rate = self.stats['rows'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Job data loaded successfully: '
+            f"{self.stats['rows']} rows, {self.stats['duplicates']} duplicates "
+            f"({self.stats['created']} created, "
+            f"{self.stats['updated']} updated, {self.stats['unchanged']} unchanged, "
+            f"{self.stats['deleted']} deleted) in {elapsed:.2f}s, {rate:.0f} rows/sec"
+        ))
+
+    def dedupe(self, parsed_files):
+        """
+        Yield each posting once across all files, keeping the first occurrence
+        """
+        seen = set()
+        for rows in parsed_files:
+            for fingerprint, row in rows:
+                self.stats['rows'] += 1
+                if fingerprint in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(fingerprint)
+                yield row
+
+    @transaction.atomic
+    def write_batch(self, batch):
+        """
+        Upsert one batch of rows keyed by URL, or by title and company for rows
+        without one; the last row wins for duplicate keys. Returns the URLs
+        written, the ids of the URL-less jobs written and the ids of the jobs
+        created or updated.
+        """
+        by_key = {}
+        for row in batch:
+            by_key[self.row_key(row)] = row
+
+        existing = {
+            job.url: job
+            for job in Job.objects.filter(url__in=[row['url'] for row in by_key.values() if row['url']])
+        }
+        without_url = [row for row in by_key.values() if not row['url']]
+        if without_url:
+            # Earlier runs may have left copies of a URL-less posting; the
+            # oldest is kept and --prune removes the rest
+            candidates = Job.objects.filter(
+                url='',
+                title__in={row['title'] for row in without_url},
+                company__in={row['company'] for row in without_url},
+            ).order_by('-id')
+            existing.update({('', job.title, job.company): job for job in candidates})
+        to_create, to_update = [], []
+        written = []
+        now = timezone.now()
+        for row in by_key.values():
+            job = existing.get(self.row_key(row))
+            if job is None:
+                job = Job(date_posted=now, **row)
+                to_create.append(job)
+            elif any(getattr(job, field) != row[field] for field in JOB_FIELDS):
+                for field in JOB_FIELDS:
+                    setattr(job, field, row[field])
+                # bulk_update skips auto_now; the change feed relies on it
+                job.updated_at = now
+                to_update.append(job)
+            else:
+                self.stats['unchanged'] += 1
+            written.append(job)
+
+        Job.objects.bulk_create(to_create)
+        Job.objects.bulk_update(to_update, JOB_FIELDS + ['updated_at'])
+        self.stats['created'] += len(to_create)
+        self.stats['updated'] += len(to_update)
+        urls = [job.url for job in written if job.url]
+        changed_ids = [job.pk for job in to_create + to_update]
+        return urls, [job.pk for job in written if not job.url], changed_ids
+
+    @staticmethod
+    def row_key(row):
+        # Rows without a URL are matched on title and company instead, here
+        # and against the jobs earlier runs stored
+        return row['url'] or ('', row['title'], row['company'])
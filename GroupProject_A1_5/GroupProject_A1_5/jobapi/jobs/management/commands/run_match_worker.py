@@ -0,0 +1,47 @@
+# jobs/management/commands/run_match_worker.py
+import multiprocessing
+from django.core.management.base import BaseCommand
+
+
+def worker_main(poll_interval, burst):
+    # Spawned processes start without Django set up; import models only after
+    import django
+    django.setup()
+    from jobs.tasks import work
+    work(poll_interval=poll_interval, burst=burst)
+
+
+class Command(BaseCommand):
+    help = 'Run queued resume/job match tasks (submitted via /api/submit_match_task/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes to run')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between checks of an empty queue')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no task is ready to run instead of waiting for more')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        self.stdout.write(f'Starting {processes} match worker(s)...')
+        if processes == 1:
+            from jobs.tasks import work
+            processed = work(poll_interval=options['poll_interval'], burst=options['burst'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Worker stopped after {processed} tasks'))
+            return
+
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=worker_main, args=(options['poll_interval'], options['burst']))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # Children got the same SIGINT and finish their current task
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS('✅ Workers stopped'))
@@ -0,0 +1,78 @@
+import hashlib
+import itertools
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MatchResult
+from .prompts import GROQ_MATCH_MODEL, MATCH_PROMPT_VERSION
+
+# Writes by this process; next() on a count is atomic under the GIL
+_writes = itertools.count(1)
+
+
+def match_cache_key(resume_hash, job, job_text, model=GROQ_MATCH_MODEL):
+    """
+    Key a match on resume bytes, job id and content, model and prompt version
+    """
+    job_hash = hashlib.sha256(job_text.encode("utf-8")).hexdigest()
+    raw = "|".join([resume_hash, str(job.pk), job_hash, model, MATCH_PROMPT_VERSION])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_match(cache_key):
+    """
+    Return the cached Groq match content for a key, or None if missing/expired
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.MATCH_CACHE_TTL_SECONDS)
+    entry = (
+        MatchResult.objects.filter(cache_key=cache_key, created_at__gte=cutoff)
+        .only("pk", "match")
+        .first()
+    )
+    if entry is None:
+        return None
+    MatchResult.objects.filter(pk=entry.pk).update(
+        hits=F("hits") + 1, last_used_at=now
+    )
+    return entry.match
+
+
+def store_match(cache_key, job, resume_hash, match, model=GROQ_MATCH_MODEL):
+    MatchResult.objects.update_or_create(
+        cache_key=cache_key,
+        defaults={
+            "job": job,
+            "resume_hash": resume_hash,
+            "model": model,
+            "prompt_version": MATCH_PROMPT_VERSION,
+            "match": match,
+            "created_at": timezone.now(),
+            "hits": 0,
+        },
+    )
+    # Eviction scans the cache, so it runs every MATCH_CACHE_EVICT_EVERY
+    # writes rather than on each one; the cache may overshoot by that much
+    if next(_writes) % settings.MATCH_CACHE_EVICT_EVERY == 0:
+        _evict_matches()
+
+
+def _evict_matches():
+    """
+    Drop expired entries, then the least recently used beyond MATCH_CACHE_MAX_ENTRIES
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MATCH_CACHE_TTL_SECONDS)
+    MatchResult.objects.filter(created_at__lt=cutoff).delete()
+    stale = MatchResult.objects.order_by("-last_used_at").values_list("pk", flat=True)[
+        settings.MATCH_CACHE_MAX_ENTRIES :
+    ]
+    stale_ids = list(stale)
+    if stale_ids:
+        MatchResult.objects.filter(pk__in=stale_ids).delete()
+
+
+def invalidate_job_matches(job_id):
+    MatchResult.objects.filter(job_id=job_id).delete()
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+
+from .groq_client import GroqError, get_groq_client
+from .match_cache import get_cached_match, match_cache_key, store_match
+from .prompts import build_match_payload, job_match_text, parse_match_json
+from .resume_text import aget_resume_text, get_resume_text
+from .utils import file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+def request_match(resume_text, job_text):
+    """
+    Ask Groq to compare a resume with a job.
+
+    Returns (content, ok); when Groq does not answer with a completion the
+    content is an error message that includes the raw response.
+    """
+    payload = build_match_payload(resume_text, job_text)
+
+    try:
+        groq_resp = get_groq_client().chat(payload)
+    except GroqError as e:
+        return f"Could not get a response from Groq: {e}", False
+    return _match_content(groq_resp)
+
+
+async def arequest_match(resume_text, job_text):
+    """
+    Async request_match() for async views
+    """
+    payload = build_match_payload(resume_text, job_text)
+
+    try:
+        groq_resp = await get_groq_client().achat(payload)
+    except GroqError as e:
+        return f"Could not get a response from Groq: {e}", False
+    return _match_content(groq_resp)
+
+
+async def astream_match(resume_text, job_text):
+    """
+    Stream a match as (event, data) pairs: ("delta", {"content": ...}) per
+    chunk from Groq, then ("result", {"match": ..., "parsed": ...}) or
+    ("error", {"error": ...})
+    """
+    payload = build_match_payload(resume_text, job_text, stream=True)
+    chunks = []
+    try:
+        async for content in get_groq_client().astream_chat(payload):
+            chunks.append(content)
+            yield "delta", {"content": content}
+    except GroqError as e:
+        yield "error", {"error": f"Could not get a response from Groq: {e}"}
+        return
+    match = "".join(chunks)
+    yield "result", {"match": match, "parsed": parse_match_json(match)}
+
+
+def _match_content(groq_resp):
+    logger.debug(
+        "Groq match response",
+        extra={"status": groq_resp.status_code, "body": groq_resp.text[:2000]},
+    )
+
+    try:
+        return groq_resp.json()["choices"][0]["message"]["content"], True
+    except Exception:
+        return (
+            f"Could not get a response from Groq. Raw response: {groq_resp.text}",
+            False,
+        )
+
+
+def match_resume_to_job(resume, job, resume_hash=None, resume_text=None):
+    """
+    Return {"match": ..., "cached": ...} for a stored resume and job.
+
+    resume_hash and resume_text may be passed in when matching one resume
+    against many jobs so they are only computed once.
+    """
+    return resolve_match(resume, job, resume_hash, resume_text)[0]
+
+
+def resolve_match(resume, job, resume_hash=None, resume_text=None):
+    """
+    match_resume_to_job() that also returns whether Groq produced a match,
+    as (result, ok), so callers can retry failures
+    """
+    job_text = job_match_text(job)
+    if resume_hash is None:
+        resume_hash = file_sha256(resume.file.path)
+
+    cache_key = match_cache_key(resume_hash, job, job_text)
+    cached_match = get_cached_match(cache_key)
+    if cached_match is not None:
+        return {"match": cached_match, "cached": True}, True
+
+    if resume_text is None:
+        resume_text = get_resume_text(resume)
+    match, ok = request_match(resume_text, job_text)
+    if ok:
+        store_match(cache_key, job, resume_hash, match)
+    return {"match": match, "cached": False}, ok
+
+
+async def amatch_resume_to_job(resume, job, resume_hash=None, resume_text=None):
+    """
+    Async match_resume_to_job(): file hashing runs in a thread, database
+    work through sync_to_async, and the Groq call awaits without holding one
+    """
+    job_text = job_match_text(job)
+    if resume_hash is None:
+        resume_hash = await asyncio.to_thread(file_sha256, resume.file.path)
+
+    cache_key = match_cache_key(resume_hash, job, job_text)
+    cached_match = await sync_to_async(get_cached_match)(cache_key)
+    if cached_match is not None:
+        return {"match": cached_match, "cached": True}
+
+    if resume_text is None:
+        resume_text = await aget_resume_text(resume)
+    match, ok = await arequest_match(resume_text, job_text)
+    if ok:
+        await sync_to_async(store_match)(cache_key, job, resume_hash, match)
+    return {"match": match, "cached": False}
+
+
+async def amatch_result_line(resume, job, resume_hash, resume_text):
+    """
+    amatch_resume_to_job() as a batch result line for job; failures are
+    reported in the line rather than raised
+    """
+    try:
+        result = await amatch_resume_to_job(resume, job, resume_hash, resume_text)
+        return {"job_id": job.pk, "title": job.title, **result}
+    except Exception as e:
+        return {"job_id": job.pk, "title": job.title, "error": str(e)}
\ No newline at end of file
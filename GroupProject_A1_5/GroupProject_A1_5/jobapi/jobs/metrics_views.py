@@ -0,0 +1,14 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from .timing import render_metrics
+
+
+@require_GET
+def metrics(request):
+    """
+    Request and phase latency histograms for this process, in the Prometheus
+    text exposition format
+    """
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
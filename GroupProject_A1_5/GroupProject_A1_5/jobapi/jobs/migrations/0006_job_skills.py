@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_matchresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='skills',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
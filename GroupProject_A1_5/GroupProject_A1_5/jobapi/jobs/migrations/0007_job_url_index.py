@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_skills'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='url',
+            field=models.URLField(blank=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:52
+
+from django.db import migrations
+
+from jobs.fts import install_fts, uninstall_fts
+
+
+def forwards(apps, schema_editor):
+    install_fts(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    uninstall_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_updated_at_jobtombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
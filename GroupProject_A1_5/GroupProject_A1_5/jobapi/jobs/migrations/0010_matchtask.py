@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('callback_url', models.URLField(blank=True)),
+                ('callback_status', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_tasks', to='jobs.job')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_tasks', to='jobs.resume')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='jobs_matcht_status_a373e9_idx')],
+            },
+        ),
+    ]
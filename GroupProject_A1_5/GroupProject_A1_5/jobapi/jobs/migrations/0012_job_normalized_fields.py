@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+from jobs.fts import install_fts
+from jobs.normalize import NORMALIZED_FIELDS, normalized_job_fields
+
+
+def backfill(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    jobs = list(Job.objects.only('id', 'salary', 'location'))
+    for job in jobs:
+        for field, value in normalized_job_fields(job.salary, job.location).items():
+            setattr(job, field, value)
+    Job.objects.bulk_update(jobs, NORMALIZED_FIELDS, batch_size=500)
+
+
+def reinstall_fts(apps, schema_editor):
+    # Adding or removing these columns rebuilds jobs_job on SQLite, which
+    # drops the full-text triggers
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_jobextraction'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the columns are dropped
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts),
+        migrations.AddField(
+            model_name='job',
+            name='city',
+            field=models.CharField(blank=True, db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='country',
+            field=models.CharField(blank=True, db_index=True, max_length=2),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='is_remote',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='region',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_max',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_period',
+            field=models.CharField(blank=True, db_index=True, max_length=10),
+        ),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
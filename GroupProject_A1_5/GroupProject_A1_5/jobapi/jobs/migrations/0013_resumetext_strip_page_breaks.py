@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from jobs.prompt_budget import strip_page_furniture
+
+# Separator older versions of utils.extract_text_from_pdf() put between pages
+OLD_PAGE_BREAK = '\n\f\n'
+
+
+def strip_page_breaks(apps, schema_editor):
+    ResumeText = apps.get_model('jobs', 'ResumeText')
+    records = list(ResumeText.objects.filter(text__contains='\f').only('id', 'text'))
+    for record in records:
+        record.text = strip_page_furniture(record.text.split(OLD_PAGE_BREAK)).strip()
+    ResumeText.objects.bulk_update(records, ['text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_job_normalized_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_page_breaks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+
+from .normalize import LOCATION_FIELDS, SALARY_FIELDS, normalized_job_fields
 
 
 class Resume(models.Model):
@@ -9,15 +12,146 @@ class Resume(models.Model):
         return f"Resume {self.id}"
 
 
+class ResumeText(models.Model):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    ]
+
+    resume = models.OneToOneField(
+        Resume, on_delete=models.CASCADE, related_name="extracted_text"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    text = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Text for resume {self.resume_id} ({self.status})"
+
+
 class Job(models.Model):
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
-    url = models.URLField(blank=True)
+    url = models.URLField(blank=True, db_index=True)
     salary = models.CharField(max_length=100, null=True, blank=True)
     job_type = models.CharField(max_length=100, blank=True)
     description = models.TextField(blank=True)
+    skills = models.JSONField(default=list, blank=True)
     date_posted = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Parsed from salary and location on save; annual amounts in dollars
+    salary_min = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    salary_max = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    salary_period = models.CharField(max_length=10, blank=True, db_index=True)
+    city = models.CharField(
+        max_length=100, blank=True, db_index=True, db_collation="NOCASE"
+    )
+    region = models.CharField(max_length=50, blank=True, db_index=True)
+    country = models.CharField(max_length=2, blank=True, db_index=True)
+    is_remote = models.BooleanField(default=False, db_index=True)
 
     def __str__(self) -> str:
         return self.title
+
+    def save(self, *args, **kwargs):
+        for field, value in normalized_job_fields(self.salary, self.location).items():
+            setattr(self, field, value)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "salary" in update_fields:
+                update_fields.update(SALARY_FIELDS)
+            if "location" in update_fields:
+                update_fields.update(LOCATION_FIELDS)
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+
+class JobTombstone(models.Model):
+    """
+    Remembers deleted jobs so the change feed can tell mirrors to drop them
+    """
+
+    job_id = models.IntegerField(db_index=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Deleted job {self.job_id}"
+
+
+class MatchResult(models.Model):
+    cache_key = models.CharField(max_length=64, unique=True)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="match_results")
+    resume_hash = models.CharField(max_length=64)
+    model = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    match = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_used_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Match job {self.job_id} / resume {self.resume_hash[:8]}"
+
+
+class JobExtraction(models.Model):
+    """
+    Structured fields Groq extracted from a job description, keyed by a hash
+    of the normalized description, model and prompt version
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    data = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Extraction {self.content_hash[:8]}"
+
+
+class MatchTask(models.Model):
+    """
+    A queued resume/job match, run by the run_match_worker command
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    resume = models.ForeignKey(
+        Resume, on_delete=models.CASCADE, related_name="match_tasks"
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="match_tasks")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    callback_url = models.URLField(blank=True)
+    callback_status = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Failed attempts are retried no earlier than this
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"Match task {self.id} ({self.status})"
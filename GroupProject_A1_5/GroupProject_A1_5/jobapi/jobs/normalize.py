@@ -0,0 +1,181 @@
+"""
+Parse the scraped free-text salary and location into structured columns.
+
+Model-free so both the CSV worker processes and Job.save() can use it.
+"""
+
+import re
+
+# Multipliers that turn a per-period amount into a yearly one
+PERIOD_ANNUAL_FACTORS = {
+    "hour": 2080,
+    "day": 260,
+    "week": 52,
+    "month": 12,
+    "year": 1,
+}
+
+AMOUNT_RE = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)\s*([kKmM]?)")
+PERIOD_RE = re.compile(r"\b(?:an?|per|/)\s*(hour|day|week|month|year)\b", re.I)
+
+US_STATES = {
+    "AL": "Alabama",
+    "AK": "Alaska",
+    "AZ": "Arizona",
+    "AR": "Arkansas",
+    "CA": "California",
+    "CO": "Colorado",
+    "CT": "Connecticut",
+    "DE": "Delaware",
+    "DC": "District of Columbia",
+    "FL": "Florida",
+    "GA": "Georgia",
+    "HI": "Hawaii",
+    "ID": "Idaho",
+    "IL": "Illinois",
+    "IN": "Indiana",
+    "IA": "Iowa",
+    "KS": "Kansas",
+    "KY": "Kentucky",
+    "LA": "Louisiana",
+    "ME": "Maine",
+    "MD": "Maryland",
+    "MA": "Massachusetts",
+    "MI": "Michigan",
+    "MN": "Minnesota",
+    "MS": "Mississippi",
+    "MO": "Missouri",
+    "MT": "Montana",
+    "NE": "Nebraska",
+    "NV": "Nevada",
+    "NH": "New Hampshire",
+    "NJ": "New Jersey",
+    "NM": "New Mexico",
+    "NY": "New York",
+    "NC": "North Carolina",
+    "ND": "North Dakota",
+    "OH": "Ohio",
+    "OK": "Oklahoma",
+    "OR": "Oregon",
+    "PA": "Pennsylvania",
+    "RI": "Rhode Island",
+    "SC": "South Carolina",
+    "SD": "South Dakota",
+    "TN": "Tennessee",
+    "TX": "Texas",
+    "UT": "Utah",
+    "VT": "Vermont",
+    "VA": "Virginia",
+    "WA": "Washington",
+    "WV": "West Virginia",
+    "WI": "Wisconsin",
+    "WY": "Wyoming",
+    "PR": "Puerto Rico",
+    "VI": "Virgin Islands",
+    "GU": "Guam",
+}
+US_STATE_CODES = {name.lower(): code for code, name in US_STATES.items()}
+
+COUNTRY_CODES = {
+    "united states": "US",
+    "united states of america": "US",
+    "usa": "US",
+    "us": "US",
+    "canada": "CA",
+    "united kingdom": "GB",
+    "uk": "GB",
+    "india": "IN",
+    "germany": "DE",
+    "australia": "AU",
+}
+
+# "Remote", "Remote in Denver, CO", "Hybrid remote in Austin, TX"
+REMOTE_RE = re.compile(r"\b(hybrid\s+)?remote(\s+in)?\b", re.I)
+
+# Job fields derived from salary and location
+SALARY_FIELDS = ["salary_min", "salary_max", "salary_period"]
+LOCATION_FIELDS = ["city", "region", "country", "is_remote"]
+NORMALIZED_FIELDS = SALARY_FIELDS + LOCATION_FIELDS
+
+
+def _amount(number, suffix):
+    value = float(number.replace(",", ""))
+    return value * {"k": 1_000, "m": 1_000_000}.get(suffix.lower(), 1)
+
+
+def parse_salary(text):
+    """
+    Return (salary_min, salary_max, period) with amounts annualized to whole
+    dollars. "Up to $X" has no minimum and "From $X" no maximum; unparseable
+    text gives (None, None, "").
+
+    >>> parse_salary("Estimated: $90K - $113K a year")
+    (90000, 113000, 'year')
+    >>> parse_salary("$60 - $65 an hour")
+    (124800, 135200, 'hour')
+    """
+    if not text:
+        return None, None, ""
+    amounts = [_amount(number, suffix) for number, suffix in AMOUNT_RE.findall(text)]
+    if not amounts:
+        return None, None, ""
+    period_match = PERIOD_RE.search(text)
+    period = period_match.group(1).lower() if period_match else "year"
+    annual = [round(a * PERIOD_ANNUAL_FACTORS[period]) for a in amounts[:2]]
+    if len(annual) == 2:
+        low, high = sorted(annual)
+    else:
+        lowered = text.lower()
+        if "up to" in lowered:
+            low, high = None, annual[0]
+        elif "from" in lowered:
+            low, high = annual[0], None
+        else:
+            low = high = annual[0]
+    return low, high, period
+
+
+def parse_location(text):
+    """
+    Split "City, ST", a state name, a country or "Remote" into city, region
+    (US state code), country (ISO code) and is_remote
+    """
+    location = {"city": "", "region": "", "country": "", "is_remote": False}
+    text = " ".join((text or "").split())
+    if REMOTE_RE.search(text):
+        location["is_remote"] = True
+        text = " ".join(REMOTE_RE.sub(" ", text).strip(" ,-()").split())
+    if not text:
+        return location
+
+    parts = [part.strip() for part in text.split(",") if part.strip()]
+    last = parts[-1]
+    if last.lower() in COUNTRY_CODES:
+        location["country"] = COUNTRY_CODES[last.lower()]
+        parts = parts[:-1]
+        if not parts:
+            return location
+        last = parts[-1]
+    if last.upper() in US_STATES and len(last) == 2:
+        location["region"] = last.upper()
+    elif last.lower() in US_STATE_CODES:
+        location["region"] = US_STATE_CODES[last.lower()]
+    if location["region"]:
+        location["country"] = location["country"] or "US"
+        parts = parts[:-1]
+    if parts:
+        location["city"] = parts[0]
+    return location
+
+
+def normalized_job_fields(salary, location):
+    """
+    Values of NORMALIZED_FIELDS for a job's raw salary and location text
+    """
+    salary_min, salary_max, salary_period = parse_salary(salary)
+    return {
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_period": salary_period,
+        **parse_location(location),
+    }
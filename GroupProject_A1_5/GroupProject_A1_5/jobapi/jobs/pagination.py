@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(last_id):
+    """
+    Wrap the last id of a page in an opaque token for the next request
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Return the last id stored in a cursor, or None for the first page.
+    Raises ValueError for anything that isn't a cursor we issued.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor.")
+    return last_id
+
+
+def encode_change_cursor(updated_at, job_id, tombstone_id):
+    """
+    Position in the change feed: last (updated_at, id) seen and last tombstone
+    """
+    payload = {
+        "t": updated_at.isoformat() if updated_at else None,
+        "i": job_id,
+        "d": tombstone_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_change_cursor(cursor):
+    """
+    Return (updated_at, job_id, tombstone_id); all None for a full sync
+    """
+    if not cursor:
+        return None, None, None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        updated_at = (
+            datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        )
+        return updated_at, payload["i"], payload["d"]
+    except Exception:
+        raise ValueError("Invalid cursor.")
@@ -0,0 +1,104 @@
+"""
+Sparse fieldsets for job payloads: pick the columns a client asked for and
+load only those, with the description optionally cut down in SQL.
+"""
+
+from django.db.models.functions import Length, Substr
+
+# Job columns a client may request
+JOB_PAYLOAD_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "location",
+    "url",
+    "salary",
+    "salary_min",
+    "salary_max",
+    "salary_period",
+    "city",
+    "region",
+    "country",
+    "is_remote",
+    "job_type",
+    "date_posted",
+    "updated_at",
+    "skills",
+    "description",
+)
+
+# What paginated_jobs returned before fields existed, kept as its default
+PAGINATED_JOB_FIELDS = ("id", "title", "company", "location", "description")
+
+DESCRIPTION_MODES = ("full", "snippet", "none")
+
+SNIPPET_CHARS = 200
+
+
+def parse_fields(value, default):
+    """
+    Accept a list or a comma-separated string of field names; raise
+    ValueError on names that aren't in JOB_PAYLOAD_FIELDS
+    """
+    if value is None or value == "":
+        return list(default)
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = []
+    for name in value:
+        name = str(name).strip()
+        if name and name not in fields:
+            fields.append(name)
+    unknown = [name for name in fields if name not in JOB_PAYLOAD_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. "
+            f"Choose from: {', '.join(JOB_PAYLOAD_FIELDS)}."
+        )
+    return fields
+
+
+def parse_description_mode(value, default="full"):
+    mode = value or default
+    if mode not in DESCRIPTION_MODES:
+        raise ValueError(f"description must be one of: {', '.join(DESCRIPTION_MODES)}.")
+    return mode
+
+
+def project_jobs(queryset, fields, description="full"):
+    """
+    Return queryset.values() over just the requested columns. In snippet mode
+    the database returns only the first SNIPPET_CHARS of the description;
+    "none" drops it even if listed in fields.
+    """
+    columns = [name for name in fields if name != "description"]
+    if "id" not in columns:
+        # Needed for cursors; stripped again by serialize_job if not requested
+        columns.append("id")
+    annotations = {}
+    if "description" in fields and description == "full":
+        columns.append("description")
+    elif "description" in fields and description == "snippet":
+        annotations = {
+            "description_snippet": Substr("description", 1, SNIPPET_CHARS),
+            "description_length": Length("description"),
+        }
+    return queryset.annotate(**annotations).values(*columns, *annotations)
+
+
+def serialize_job(row, fields, description="full"):
+    """
+    Turn a project_jobs() row into the payload dict, in the requested field order
+    """
+    data = {}
+    for name in fields:
+        if name != "description":
+            data[name] = row[name]
+        elif description == "full":
+            data[name] = row["description"]
+        elif description == "snippet":
+            snippet = row["description_snippet"] or ""
+            if (row["description_length"] or 0) > SNIPPET_CHARS:
+                snippet = snippet.rstrip() + "…"
+            data[name] = snippet
+    return data
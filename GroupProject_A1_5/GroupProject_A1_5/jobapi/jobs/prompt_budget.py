@@ -0,0 +1,185 @@
+"""
+Shrink resume and job text before it goes into a Groq prompt: normalize
+whitespace, cut job-ad boilerplate and hold each section to a token budget.
+strip_page_furniture() drops page numbers and running headers/footers as
+PDF pages are extracted.
+"""
+
+import html
+import math
+import re
+import unicodedata
+from collections import Counter
+
+# Rough chars-per-token for English prose with Llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "[…truncated]"
+
+BULLET_RE = re.compile(r"^[\s•●▪◦‣∙·*\-–—]+")
+SPACE_RE = re.compile(r"[^\S\n]+")
+# "Page 2", "Page 2 of 3", "2 of 3", "- 2 -"
+PAGE_FURNITURE_RE = re.compile(
+    r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s+of\s+\d+|-\s*\d+\s*-)$", re.I
+)
+
+# Sentences that are job-ad boilerplate wherever they appear
+BOILERPLATE_RE = re.compile(
+    r"equal (employment )?opportunity|without regard to|regardless of"
+    r"|reasonable accommodation|e-verify|protected veteran|sexual orientation"
+    r"|background check|drug[- ]free|click apply|apply now|apply today"
+    r"|pay transparency|^#li-|job id:|req(uisition)? id:",
+    re.I,
+)
+
+# Section headings whose whole section is boilerplate for matching purposes
+BOILERPLATE_HEADING_RE = re.compile(
+    r"^(about (us|the company|our company)|benefits|perks"
+    r"|what we offer|why join us|why work with us|our culture|eeo statement"
+    r"|equal opportunity( employer)?|disclaimer|how to apply)\s*:?$",
+    re.I,
+)
+# Headings of the sections that make up the rest of a job ad
+SECTION_HEADING_RE = re.compile(
+    r"^(about (the )?(role|job|position|you)|the role|job description|overview"
+    r"|(key )?responsibilities|what you['’]ll (do|bring|need)|who you are"
+    r"|(minimum |preferred |basic |required )?qualifications|requirements"
+    r"|(required |preferred )?skills|experience|education|nice to have"
+    r"|bonus points|what we['’]re looking for)\s*:?$",
+    re.I,
+)
+# Short line without sentence punctuation, e.g. "What You’ll Do:"
+HEADING_RE = re.compile(r"^[^\W\d_][^.!?;]{1,60}$")
+
+# Scraped descriptions often arrive as one long line with sentences run
+# together ("...possible!If you..."), so boilerplate is cut per sentence
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s*(?=[A-Z*#])")
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_text(text):
+    """
+    Unescape HTML entities, NFKC-normalize, strip bullets, collapse runs of
+    spaces and blank lines
+    """
+    text = unicodedata.normalize("NFKC", html.unescape(text)).replace("\r", "\n")
+    lines = []
+    for line in text.split("\n"):
+        line = SPACE_RE.sub(" ", BULLET_RE.sub("", line)).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _page_edges(keys):
+    """
+    Split one page's edges into (page number indexes, top line indexes,
+    bottom line indexes): page numbers are looked for in the first and last
+    non-blank lines, then the outermost remaining lines are the edges
+    """
+    filled = [i for i, key in enumerate(keys) if key]
+    numbers = {
+        i for i in filled[:1] + filled[-1:] if PAGE_FURNITURE_RE.match(keys[i])
+    }
+    rest = [i for i in filled if i not in numbers]
+    return numbers, rest[:1], rest[-1:]
+
+
+def strip_page_furniture(pages):
+    """
+    Drop page numbers and running headers/footers from a list of raw page
+    texts and join them. Only a page's outermost lines are touched: a page
+    number must sit there, and a header (footer) is a line that tops
+    (ends) more than one page; its first occurrence is kept. Repeats in the
+    body of a page, e.g. the same bullet under two jobs, stay.
+    """
+    pages = [page.split("\n") for page in pages]
+    keys = [
+        [SPACE_RE.sub(" ", line).strip().lower() for line in lines]
+        for lines in pages
+    ]
+    edges = [_page_edges(page_keys) for page_keys in keys]
+    tops = Counter(keys[p][i] for p, (_, top, _) in enumerate(edges) for i in top)
+    bottoms = Counter(
+        keys[p][i] for p, (_, _, bottom) in enumerate(edges) for i in bottom
+    )
+
+    seen = set()
+    kept = []
+    for lines, page_keys, (numbers, top, bottom) in zip(pages, keys, edges):
+        drop = set(numbers)
+        for counts, indexes in ((tops, top), (bottoms, bottom)):
+            for i in indexes:
+                key = page_keys[i]
+                if counts[key] > 1:
+                    if key in seen:
+                        drop.add(i)
+                    seen.add(key)
+        kept.extend(line for i, line in enumerate(lines) if i not in drop)
+    return "\n".join(kept)
+
+
+def _is_heading(line):
+    # Short lines alone aren't enough: bullets like "Dental" under Benefits
+    # would end the section
+    if BOILERPLATE_HEADING_RE.match(line) or SECTION_HEADING_RE.match(line):
+        return True
+    return bool(HEADING_RE.match(line)) and (line.endswith(":") or line.isupper())
+
+
+def trim_job_boilerplate(text):
+    """
+    Remove EEO/legal sentences and benefits/about-us style sections from a
+    job description
+    """
+    lines = []
+    skipping = False
+    for line in text.split("\n"):
+        if line and _is_heading(line):
+            skipping = bool(BOILERPLATE_HEADING_RE.match(line))
+            if skipping:
+                continue
+        if skipping:
+            continue
+        sentences = [
+            sentence
+            for sentence in SENTENCE_RE.split(line)
+            if not BOILERPLATE_RE.search(sentence)
+        ]
+        if line and not sentences:
+            continue
+        lines.append(" ".join(sentences))
+    return "\n".join(lines).strip()
+
+
+def fit_budget(text, max_tokens):
+    """
+    Cut text to max_tokens at a line (or, failing that, word) boundary
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER) - 1
+    cut = text[: max(limit, 0)]
+    boundary = cut.rfind("\n")
+    if boundary < len(cut) // 2:
+        boundary = cut.rfind(" ")
+    if boundary > 0:
+        cut = cut[:boundary]
+    return f"{cut.rstrip()}\n{TRUNCATION_MARKER}"
+
+
+def compact_text(text, max_tokens, job=False):
+    """
+    Return (compacted text, {"original_tokens", "tokens"})
+    """
+    compacted = normalize_text(text or "")
+    if job:
+        compacted = trim_job_boilerplate(compacted)
+    compacted = fit_budget(compacted, max_tokens)
+    return compacted, {
+        "original_tokens": estimate_tokens(text or ""),
+        "tokens": estimate_tokens(compacted),
+    }
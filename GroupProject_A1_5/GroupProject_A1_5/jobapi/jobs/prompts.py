@@ -0,0 +1,129 @@
+import json
+import logging
+import re
+
+from django.conf import settings
+
+from .prompt_budget import compact_text
+from .timing import phase
+
+logger = logging.getLogger(__name__)
+
+GROQ_MATCH_MODEL = "deepseek-r1-distill-llama-70b"
+
+# Bump whenever the prompt text changes so cached match results are not reused
+MATCH_PROMPT_VERSION = "3"
+
+MATCH_SYSTEM_MESSAGE = "You are a highly accurate and concise job matching assistant."
+
+# Reasoning models may think out loud before answering
+THINK_RE = re.compile(r"<think>.*?</think>", re.S)
+
+
+def build_match_prompt(resume_text, job_text):
+    """
+    Build the ATS-style prompt comparing a resume with a job description
+    """
+    return f"""
+        You are an advanced ATS (Applicant Tracking System) assistant specializing in software and IT jobs.
+        Read the resume and job description, then return a detailed JSON analysis with the following:
+
+        1. rank → Match score from 0–100 showing how well the resume fits the job.
+        2. skills → List of all hard (technical) and soft skills found in the resume.
+        3. total_experience → Total professional experience in years (approximate if needed).
+        4. project_category → Categories or domains of projects in the resume (e.g., AI, Web Development, Cloud, Data Science, Mobile Apps, etc.).
+        5. missing_skills → List of important skills in the job description that are not clearly mentioned in the resume.
+        6. improvement_suggestions → Actionable ways the candidate can improve the resume for better ATS and recruiter match rates.
+
+        Resume:
+        {resume_text}
+
+        Job Description:
+        {job_text}
+
+        Respond ONLY with valid JSON in the exact structure below:
+        {{
+            "rank": <number>,
+            "skills": ["skill1", "skill2", ...],
+            "total_experience": <number>,
+            "project_category": ["category1", "category2", ...],
+            "missing_skills": ["skill1", "skill2", ...],
+            "improvement_suggestions": ["suggestion1", "suggestion2", ...]
+        }}
+        """
+
+
+def compact_match_inputs(resume_text, job_text):
+    """
+    Compact both prompt sections to their token budgets; returns
+    (resume_text, job_text, stats)
+    """
+    resume_text, resume_stats = compact_text(
+        resume_text, settings.MATCH_PROMPT_RESUME_TOKENS
+    )
+    job_text, job_stats = compact_text(
+        job_text, settings.MATCH_PROMPT_JOB_TOKENS, job=True
+    )
+    original = resume_stats["original_tokens"] + job_stats["original_tokens"]
+    tokens = resume_stats["tokens"] + job_stats["tokens"]
+    stats = {
+        "resume": resume_stats,
+        "job": job_stats,
+        "tokens": tokens,
+        "saved_tokens": original - tokens,
+    }
+    return resume_text, job_text, stats
+
+
+def build_match_payload(resume_text, job_text, stream=False):
+    """
+    Build the Groq chat completion payload for a resume/job match. Groq's
+    JSON mode can't stream, so streamed payloads rely on the prompt alone
+    and the result goes through parse_match_json.
+    """
+    with phase("prompt"):
+        resume_text, job_text, stats = compact_match_inputs(resume_text, job_text)
+        prompt = build_match_prompt(resume_text, job_text)
+    logger.info(
+        "Match prompt built",
+        extra={"prompt_tokens": stats["tokens"], "saved_tokens": stats["saved_tokens"]},
+    )
+    payload = {
+        "model": GROQ_MATCH_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": MATCH_SYSTEM_MESSAGE,
+            },
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0,
+        "response_format": {"type": "json_object"},
+    }
+    if stream:
+        del payload["response_format"]
+        payload["stream"] = True
+    return payload
+
+
+def parse_match_json(text):
+    """
+    Pull the JSON object out of a streamed match: drop any <think> block and
+    code fences, then parse from the first { to the last }. None if that
+    isn't valid JSON.
+    """
+    text = THINK_RE.sub("", text)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def job_match_text(job):
+    """
+    Flatten a Job row into the text used as the job description in prompts
+    """
+    return f"{job.title}\n{job.company}\n{job.location}\n{job.description}"
@@ -0,0 +1,108 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .models import ResumeText
+from .utils import extract_resume_text
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps the workers free of the parent's open DB connections
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.RESUME_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _store_result(resume_id, future):
+    global _pending
+    with _executor_lock:
+        _pending -= 1
+    try:
+        text = future.result()
+        ResumeText.objects.filter(resume_id=resume_id).update(
+            status=ResumeText.READY, text=text, error=""
+        )
+    except Exception as e:
+        ResumeText.objects.filter(resume_id=resume_id).update(
+            status=ResumeText.FAILED, error=str(e)
+        )
+    finally:
+        # Callbacks run on the executor's management thread, which Django
+        # does not clean up after
+        connection.close()
+
+
+def enqueue_resume_extraction(resume):
+    """
+    Create a pending ResumeText row and extract the text in the process pool.
+
+    When the pool already has RESUME_EXTRACTION_MAX_PENDING jobs queued the
+    row is left pending and the text is extracted on first use instead.
+    """
+    global _pending
+    record, _ = ResumeText.objects.update_or_create(
+        resume=resume,
+        defaults={"status": ResumeText.PENDING, "text": "", "error": ""},
+    )
+    with _executor_lock:
+        if _pending >= settings.RESUME_EXTRACTION_MAX_PENDING:
+            return record
+        _pending += 1
+    try:
+        # Already off the request path, so don't fan out again inside the worker
+        future = _get_executor().submit(
+            extract_resume_text, resume.file.path, parallel=False
+        )
+    except Exception:
+        with _executor_lock:
+            _pending -= 1
+        return record
+    future.add_done_callback(lambda f: _store_result(resume.id, f))
+    return record
+
+
+def get_resume_text(resume):
+    """
+    Return the stored text for a resume, extracting it now if the background
+    worker has not finished (or never ran)
+    """
+    record = ResumeText.objects.filter(resume=resume).first()
+    if record is not None and record.status == ResumeText.READY:
+        return record.text
+
+    text = extract_resume_text(resume.file.path)
+    ResumeText.objects.update_or_create(
+        resume=resume,
+        defaults={"status": ResumeText.READY, "text": text, "error": ""},
+    )
+    return text
+
+
+async def aget_resume_text(resume):
+    """
+    Async get_resume_text(); extraction runs in a worker thread so the event
+    loop keeps serving other requests meanwhile
+    """
+    record = await ResumeText.objects.filter(resume=resume).afirst()
+    if record is not None and record.status == ResumeText.READY:
+        return record.text
+
+    text = await asyncio.to_thread(extract_resume_text, resume.file.path)
+    await ResumeText.objects.aupdate_or_create(
+        resume=resume,
+        defaults={"status": ResumeText.READY, "text": text, "error": ""},
+    )
+    return text
@@ -1,20 +1,24 @@
+import logging
 from django.http import JsonResponse
 from .models import Resume
-from .utils import extract_text_from_pdf
+from .resume_text import get_resume_text
+from .utils import pdf_engine_stats, pdf_text_cache_stats
+
+logger = logging.getLogger(__name__)
 
 
 def get_resume(request):
     resume_id = request.GET.get("resume_id")
-    print(f"resume id: ", resume_id)
+    logger.debug("get_resume", extra={"resume_id": resume_id})
     try:
         resume = Resume.objects.get(id=resume_id)
-        file_path = resume.file.path
-
-        if file_path.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_path)
-        else:
-            # fallback for non-pdf files
-            text = open(file_path, encoding="utf-8").read()
+        text = get_resume_text(resume)
     except Exception as e:
         text = f"Error: {str(e)}"
     return JsonResponse({"text": text})
+
+
+def pdf_cache_stats(request):
+    stats = pdf_text_cache_stats()
+    stats["engines"] = pdf_engine_stats()
+    return JsonResponse(stats)
@@ -0,0 +1,347 @@
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from django.conf import settings
+
+from .models import Job
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or our that
+    the their this to we will with you your who what which while were was
+    """.split()
+)
+
+# Title terms count this many times so a match in the title outranks one
+# buried in a long description
+TITLE_WEIGHT = 2
+
+_lock = threading.RLock()
+_index = None
+_index_stamp = None
+# (inode, bytes read) of the change log replayed onto _index, and how many
+# records it held
+_log_seen = None
+_log_records = 0
+_file_lock_depth = 0
+_deferred = threading.local()
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def job_index_text(job):
+    return " ".join([job.title] * TITLE_WEIGHT + [job.description])
+
+
+class BM25Index:
+    """
+    In-memory inverted index over job titles and descriptions with BM25 scoring
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self):
+        self.postings = {}  # term -> {job_id: term frequency}
+        self.doc_terms = {}  # job_id -> list of distinct terms, for removal
+        self.doc_len = {}
+        self.total_len = 0
+
+    def add(self, job_id, text):
+        self.remove(job_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[job_id] = tf
+        self.doc_terms[job_id] = list(counts)
+        length = sum(counts.values())
+        self.doc_len[job_id] = length
+        self.total_len += length
+
+    def remove(self, job_id):
+        terms = self.doc_terms.pop(job_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(job_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(job_id, 0)
+
+    def search(self, text, top_k=10):
+        """
+        Return [(job_id, score), ...] for the top_k jobs matching text
+        """
+        n_docs = len(self.doc_len)
+        if not n_docs:
+            return []
+        avg_len = self.total_len / n_docs
+        scores = Counter()
+        for term in set(tokenize(text)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for job_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[job_id] / avg_len)
+                scores[job_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores.most_common(top_k)
+
+
+def _index_path():
+    return Path(settings.JOB_INDEX_PATH)
+
+
+def _stamp(path):
+    """
+    Identify the file's current version; every save replaces the file, so
+    the inode changes even when the mtime doesn't
+    """
+    st = path.stat()
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _locked():
+    """
+    Hold _lock and an exclusive lock on the index's .lock file, so threads
+    and server/worker processes take turns reading, changing and writing
+    the index. Reentrant within a process.
+    """
+    global _file_lock_depth
+    with _lock:
+        handle = None
+        if not _file_lock_depth:
+            path = _index_path().with_suffix(".lock")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "a+b")
+            try:
+                _lock_file(handle)
+            except BaseException:
+                handle.close()
+                raise
+        _file_lock_depth += 1
+        try:
+            yield
+        finally:
+            _file_lock_depth -= 1
+            if handle is not None:
+                try:
+                    _unlock_file(handle)
+                finally:
+                    handle.close()
+
+
+def _log_path():
+    return _index_path().with_suffix(".log")
+
+
+def _log_state():
+    try:
+        st = _log_path().stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_size
+
+
+def _save(index):
+    """
+    Write index as the new snapshot and drop the change log it already
+    includes. Call with _locked() held.
+    """
+    global _index, _index_stamp, _log_seen, _log_records
+    path = _index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    _log_path().unlink(missing_ok=True)
+    _index = index
+    _index_stamp = _stamp(path)
+    _log_seen = None
+    _log_records = 0
+
+
+def _apply(index, record):
+    job_id, text = record
+    if text is None:
+        index.remove(job_id)
+    else:
+        index.add(job_id, text)
+
+
+def _replay_log():
+    """
+    Apply change log records this process hasn't seen yet to _index. Call
+    with _locked() held.
+    """
+    global _log_seen, _log_records
+    state = _log_state()
+    if state is None:
+        _log_seen = None
+        return
+    ino, size = state
+    offset = _log_seen[1] if _log_seen and _log_seen[0] == ino else 0
+    if size > offset:
+        with open(_log_path(), "rb") as f:
+            f.seek(offset)
+            while f.tell() < size:
+                try:
+                    record = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    # A writer died mid-record; start over from the database
+                    rebuild_index()
+                    return
+                _apply(_index, record)
+                _log_records += 1
+            offset = f.tell()
+    _log_seen = (ino, offset)
+
+
+def _refresh():
+    """
+    Bring _index up to date with the snapshot and change log on disk. Call
+    with _locked() held.
+    """
+    global _index, _index_stamp, _log_seen, _log_records
+    path = _index_path()
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        rebuild_index()
+        return
+    if _index is None or stamp != _index_stamp:
+        with open(path, "rb") as f:
+            _index = pickle.load(f)
+        _index_stamp = stamp
+        _log_seen = None
+        _log_records = 0
+    _replay_log()
+
+
+def rebuild_index():
+    """
+    Build the index from every Job row and persist it
+    """
+    with _locked():
+        index = BM25Index()
+        for job in Job.objects.only("id", "title", "description").iterator():
+            index.add(job.pk, job_index_text(job))
+        _save(index)
+    return index
+
+
+def get_index():
+    """
+    Return this process's copy of the index, catching up with snapshots and
+    changes other processes have written and building it on first use
+    """
+    with _lock:
+        if _index is not None:
+            try:
+                current = _stamp(_index_path())
+            except OSError:
+                current = None
+            # _log_seen is None when no log has been read; a missing log
+            # gives None from _log_state() too
+            if current == _index_stamp and _log_state() == _log_seen:
+                return _index
+        with _locked():
+            _refresh()
+            return _index
+
+
+@contextmanager
+def deferred_index_updates():
+    """
+    Hold back per-row index updates (e.g. during bulk loads) and apply them
+    once at the end. Yields the set of changed job ids, which callers add
+    bulk_create/bulk_update ids to since those skip the signals.
+    """
+    changed = _deferred.changed = set()
+    try:
+        yield changed
+    finally:
+        _deferred.changed = None
+        if len(changed) >= settings.JOB_INDEX_COMPACT_EVERY:
+            rebuild_index()
+        elif changed:
+            _reindex_jobs(changed)
+
+
+def _reindex_jobs(job_ids):
+    jobs = Job.objects.filter(pk__in=job_ids).only("id", "title", "description")
+    texts = {job.pk: job_index_text(job) for job in jobs}
+    with _locked():
+        for job_id in job_ids:
+            # Ids no longer in the table were deleted
+            _record_change(job_id, texts.get(job_id))
+
+
+def _record_change(job_id, text):
+    """
+    Apply one job's change to this process's index and append it to the
+    change log, folding the log into a new snapshot every
+    JOB_INDEX_COMPACT_EVERY records
+    """
+    global _log_seen, _log_records
+    deferred = getattr(_deferred, "changed", None)
+    if deferred is not None:
+        deferred.add(job_id)
+        return
+    with _locked():
+        # Catch up with other processes' changes before appending ours
+        index = get_index()
+        record = (job_id, text)
+        _apply(index, record)
+        with open(_log_path(), "ab") as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            _log_seen = (os.fstat(f.fileno()).st_ino, f.tell())
+        _log_records += 1
+        if _log_records >= settings.JOB_INDEX_COMPACT_EVERY:
+            _save(index)
+
+
+def update_job(job):
+    _record_change(job.pk, job_index_text(job))
+
+
+def remove_job(job_id):
+    _record_change(job_id, None)
+
+
+def shortlist_jobs(text, top_k=10):
+    return get_index().search(text, top_k)
@@ -0,0 +1,36 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search_index, skills
+from .match_cache import invalidate_job_matches
+from .models import Job, JobTombstone
+from .timing import time_query
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, **kwargs):
+    if not created:
+        # Cached matches were computed against the old job text
+        invalidate_job_matches(instance.pk)
+    # After commit, so a rolled back save never reaches the index
+    transaction.on_commit(partial(search_index.update_job, instance))
+    transaction.on_commit(skills.invalidate)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    JobTombstone.objects.create(job_id=instance.pk)
+    transaction.on_commit(partial(search_index.remove_job, instance.pk))
+    transaction.on_commit(skills.invalidate)
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        # At the front: execute_wrapper() blocks pop the last entry on exit,
+        # and a connection opened inside one must not lose this wrapper
+        connection.execute_wrappers.insert(0, time_query)
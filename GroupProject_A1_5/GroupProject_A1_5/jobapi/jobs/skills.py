@@ -0,0 +1,140 @@
+import re
+import threading
+
+import numpy as np
+from django.db.models import Count, Max
+from scipy import sparse
+
+from .models import Job
+
+_lock = threading.Lock()
+_matrix = None
+
+
+def normalize_skill(skill):
+    return " ".join(skill.lower().split())
+
+
+class SkillMatrix:
+    """
+    Binary job x skill matrix over the vocabulary of every Job.skills entry
+    """
+
+    def __init__(self, job_ids, vocabulary, matrix, signature):
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.vocabulary = vocabulary  # normalized skill -> column
+        self.matrix = matrix  # CSR, one row per job
+        self.signature = signature
+        self.skill_counts = np.asarray(matrix.sum(axis=1)).ravel()
+        self.names = [None] * len(vocabulary)
+        for skill, column in vocabulary.items():
+            self.names[column] = skill
+        # Longest first so "react native" wins over "react"
+        alternation = "|".join(
+            re.escape(skill) for skill in sorted(vocabulary, key=len, reverse=True)
+        )
+        self.pattern = (
+            re.compile(rf"(?<![\w+#.])(?:{alternation})(?![\w+#])")
+            if vocabulary
+            else None
+        )
+
+    def resume_vectors(self, texts):
+        """
+        Return a (len(texts) x skills) CSR matrix of skills mentioned in each text
+        """
+        rows, cols = [], []
+        for row, text in enumerate(texts if self.pattern else []):
+            found = {
+                self.vocabulary[normalize_skill(m.group(0))]
+                for m in self.pattern.finditer(" ".join(text.lower().split()))
+            }
+            rows.extend([row] * len(found))
+            cols.extend(found)
+        data = np.ones(len(rows), dtype=np.float32)
+        return sparse.csr_matrix(
+            (data, (rows, cols)), shape=(len(texts), len(self.vocabulary))
+        )
+
+    def score(self, texts):
+        """
+        Return a (resumes x jobs) array of the share of each job's skills that
+        appear in each resume, computed in one sparse product
+        """
+        overlap = (self.resume_vectors(texts) @ self.matrix.T).toarray()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(self.skill_counts > 0, overlap / self.skill_counts, 0.0)
+        return scores
+
+    def rank(self, text, top_k=10):
+        """
+        Return [(job_id, score, matched, missing), ...] for the best top_k jobs
+        """
+        resume = self.resume_vectors([text])
+        scores = self.score([text])[0]
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        resume_skills = set(resume.indices)
+        results = []
+        for row in best:
+            job_skills = self.matrix.indices[
+                self.matrix.indptr[row] : self.matrix.indptr[row + 1]
+            ]
+            matched = [self.names[c] for c in job_skills if c in resume_skills]
+            missing = [self.names[c] for c in job_skills if c not in resume_skills]
+            results.append((int(self.job_ids[row]), float(scores[row]), matched, missing))
+        return results
+
+
+def _catalog_signature():
+    return tuple(
+        Job.objects.aggregate(
+            count=Count("id"), max_id=Max("id"), updated=Max("updated_at")
+        ).values()
+    )
+
+
+def build_skill_matrix(signature=None):
+    job_ids, job_skills, vocabulary = [], [], {}
+    for job_id, skills in Job.objects.order_by("id").values_list("id", "skills"):
+        columns = set()
+        for skill in skills or []:
+            key = normalize_skill(skill)
+            if key:
+                columns.add(vocabulary.setdefault(key, len(vocabulary)))
+        job_ids.append(job_id)
+        job_skills.append(columns)
+
+    indptr = np.zeros(len(job_ids) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(columns) for columns in job_skills])
+    indices = np.fromiter(
+        (c for columns in job_skills for c in sorted(columns)), dtype=np.int32
+    )
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (data, indices, indptr), shape=(len(job_ids), len(vocabulary))
+    )
+    return SkillMatrix(
+        job_ids, vocabulary, matrix, signature or _catalog_signature()
+    )
+
+
+def get_skill_matrix():
+    """
+    Return this process's matrix, rebuilding it when the Job table has changed
+    """
+    global _matrix
+    signature = _catalog_signature()
+    with _lock:
+        if _matrix is None or _matrix.signature != signature:
+            _matrix = build_skill_matrix(signature)
+        return _matrix
+
+
+def invalidate():
+    global _matrix
+    with _lock:
+        _matrix = None
@@ -0,0 +1,82 @@
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from .models import Job, MatchTask, Resume
+from .tasks import check_callback_url, submit_match_tasks, task_payload
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def submit_match_task(request):
+    """
+    Queue resume/job matches and return at once with 202 and the task ids.
+
+    Body: resume_id, job_id or job_ids (up to MATCH_BATCH_MAX_JOBS), and an
+    optional callback_url that receives each finished task as a JSON POST.
+    """
+    try:
+        data = json.loads(request.body)
+        resume = Resume.objects.get(id=data.get("resume_id"))
+        job_ids = data.get("job_ids") or [data.get("job_id")]
+        if not isinstance(job_ids, list):
+            return JsonResponse({"error": "job_ids must be a list."}, status=400)
+        if None in job_ids:
+            return JsonResponse({"error": "job_id or job_ids is required."}, status=400)
+        job_ids = [int(job_id) for job_id in job_ids]
+        if len(job_ids) > settings.MATCH_BATCH_MAX_JOBS:
+            return JsonResponse(
+                {"error": f"At most {settings.MATCH_BATCH_MAX_JOBS} jobs per request."},
+                status=400,
+            )
+        jobs = Job.objects.in_bulk(job_ids)
+        missing = [job_id for job_id in job_ids if job_id not in jobs]
+        if missing:
+            return JsonResponse({"error": f"Unknown job ids: {missing}"}, status=400)
+        callback_url = data.get("callback_url") or ""
+        if callback_url:
+            URLValidator(schemes=["http", "https"])(callback_url)
+            check_callback_url(callback_url)
+    except ValidationError:
+        return JsonResponse(
+            {"error": "callback_url must be an http(s) URL."}, status=400
+        )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    tasks = submit_match_tasks(
+        resume, [jobs[job_id] for job_id in job_ids], callback_url
+    )
+    return JsonResponse({"tasks": [task_payload(task) for task in tasks]}, status=202)
+
+
+def match_task_status(request):
+    """
+    Return the state of queued match tasks: task_id, or task_ids as a
+    comma-separated list
+    """
+    raw_ids = request.GET.get("task_ids") or request.GET.get("task_id") or ""
+    try:
+        task_ids = [int(task_id) for task_id in raw_ids.split(",") if task_id]
+    except ValueError:
+        return JsonResponse({"error": "task ids must be integers."}, status=400)
+    if not task_ids:
+        return JsonResponse({"error": "task_id is required."}, status=400)
+
+    if "task_ids" not in request.GET:
+        if len(task_ids) != 1:
+            return JsonResponse(
+                {"error": "task_id takes one id; use task_ids for several."},
+                status=400,
+            )
+        task = MatchTask.objects.filter(pk=task_ids[0]).first()
+        if task is None:
+            return JsonResponse({"error": "Task not found."}, status=404)
+        return JsonResponse(task_payload(task))
+
+    tasks = MatchTask.objects.in_bulk(task_ids)
+    found = [task_payload(tasks[task_id]) for task_id in task_ids if task_id in tasks]
+    return JsonResponse({"tasks": found})
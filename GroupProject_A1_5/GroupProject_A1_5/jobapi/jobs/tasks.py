@@ -0,0 +1,233 @@
+"""
+Durable queue for resume/job matches.
+
+MatchTask rows are the queue: the submit endpoint inserts them, the
+run_match_worker command claims and runs them, and clients either poll the
+status endpoint or get the finished task POSTed to their callback_url.
+"""
+
+import ipaddress
+import json
+import signal
+import socket
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .matching import resolve_match
+from .models import MatchTask
+
+
+def submit_match_tasks(resume, jobs, callback_url=""):
+    now = timezone.now()
+    return MatchTask.objects.bulk_create(
+        [
+            MatchTask(
+                resume=resume,
+                job=job,
+                callback_url=callback_url,
+                created_at=now,
+                run_after=now,
+            )
+            for job in jobs
+        ]
+    )
+
+
+def check_callback_url(url):
+    """
+    Raise ValueError unless url is an http(s) URL whose host is listed in
+    MATCH_TASK_CALLBACK_ALLOWED_HOSTS or resolves only to public addresses,
+    so callbacks can't be aimed at services on the server's own network
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL.")
+    host = parts.hostname.rstrip(".")
+    if host in settings.MATCH_TASK_CALLBACK_ALLOWED_HOSTS:
+        return
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError) as e:
+        raise ValueError("callback_url host could not be resolved.") from e
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(
+                "callback_url must not point at a loopback, private, link-local "
+                "or reserved address."
+            )
+
+
+def task_payload(task):
+    return {
+        "id": task.pk,
+        "status": task.status,
+        "resume_id": task.resume_id,
+        "job_id": task.job_id,
+        "result": task.result,
+        "error": task.error,
+        "attempts": task.attempts,
+        "created_at": task.created_at,
+        "finished_at": task.finished_at,
+    }
+
+
+def claim_next_task():
+    """
+    Move the oldest runnable queued task to running and return it, or None.
+    The conditional UPDATE means two workers can't claim the same task.
+    """
+    while True:
+        now = timezone.now()
+        task_id = (
+            MatchTask.objects.filter(status=MatchTask.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if task_id is None:
+            return None
+        claimed = MatchTask.objects.filter(pk=task_id, status=MatchTask.QUEUED).update(
+            status=MatchTask.RUNNING, started_at=now, attempts=F("attempts") + 1
+        )
+        if claimed:
+            return MatchTask.objects.select_related("resume", "job").get(pk=task_id)
+
+
+def requeue_stale_tasks():
+    """
+    Put back tasks left running by a worker that died mid-task. Tasks that
+    were already on their last attempt are failed instead, so one that
+    kills the worker (OOM, a crash in PDF parsing) isn't retried forever.
+    Returns how many tasks were requeued.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.MATCH_TASK_TIMEOUT_SECONDS)
+    stale = MatchTask.objects.filter(status=MatchTask.RUNNING, started_at__lt=cutoff)
+    exhausted = list(
+        stale.filter(attempts__gte=settings.MATCH_TASK_MAX_ATTEMPTS).values_list(
+            "id", flat=True
+        )
+    )
+    if exhausted:
+        stale.filter(pk__in=exhausted).update(
+            status=MatchTask.FAILED,
+            finished_at=now,
+            error=(
+                f"The worker stopped during attempt {settings.MATCH_TASK_MAX_ATTEMPTS}"
+                " of this task without finishing it."
+            ),
+        )
+        for task in MatchTask.objects.filter(
+            pk__in=exhausted, status=MatchTask.FAILED
+        ).exclude(callback_url=""):
+            send_callback(task)
+    return stale.update(status=MatchTask.QUEUED, run_after=now)
+
+
+def run_task(task):
+    """
+    Run a claimed task. Failed matches are requeued with exponential backoff
+    until MATCH_TASK_MAX_ATTEMPTS, then marked failed.
+    """
+    try:
+        result, ok = resolve_match(task.resume, task.job)
+        error = "" if ok else result["match"]
+    except Exception as e:
+        result, ok, error = None, False, str(e)
+
+    now = timezone.now()
+    task.error = error
+    if ok:
+        task.status = MatchTask.DONE
+        task.result = result
+        task.finished_at = now
+    elif task.attempts < settings.MATCH_TASK_MAX_ATTEMPTS:
+        delay = settings.MATCH_TASK_RETRY_DELAY_SECONDS * 2 ** (task.attempts - 1)
+        task.status = MatchTask.QUEUED
+        task.run_after = now + timedelta(seconds=delay)
+    else:
+        task.status = MatchTask.FAILED
+        task.finished_at = now
+    task.save(
+        update_fields=["status", "result", "error", "run_after", "finished_at"]
+    )
+
+    if task.finished_at and task.callback_url:
+        send_callback(task)
+    return task
+
+
+def send_callback(task):
+    """
+    POST the finished task to its callback_url, retrying briefly; the
+    outcome is kept in callback_status
+    """
+    body = json.dumps(task_payload(task), cls=DjangoJSONEncoder)
+    outcome = ""
+    for attempt in range(settings.MATCH_TASK_CALLBACK_ATTEMPTS):
+        if attempt:
+            time.sleep(2**attempt)
+        try:
+            # Checked again here: DNS may have changed since submission
+            check_callback_url(task.callback_url)
+        except ValueError:
+            outcome = "blocked: callback_url resolves to a non-public address"
+            break
+        try:
+            # Redirects aren't followed; they could lead anywhere
+            response = requests.post(
+                task.callback_url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=settings.MATCH_TASK_CALLBACK_TIMEOUT,
+                allow_redirects=False,
+            )
+        except requests.RequestException as e:
+            outcome = f"error: {e.__class__.__name__}"
+            continue
+        outcome = str(response.status_code)
+        if response.status_code < 500:
+            break
+    task.callback_status = outcome[:100]
+    task.save(update_fields=["callback_status"])
+
+
+def work(poll_interval=1.0, burst=False):
+    """
+    Worker loop: claim and run tasks until SIGTERM/SIGINT, or until the
+    queue is empty when burst is set. A running task is finished first.
+    """
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    processed = 0
+    requeue_stale_tasks()
+    while not stopping:
+        close_old_connections()
+        task = claim_next_task()
+        if task is None:
+            if burst:
+                break
+            requeue_stale_tasks()
+            time.sleep(poll_interval)
+            continue
+        run_task(task)
+        processed += 1
+    return processed
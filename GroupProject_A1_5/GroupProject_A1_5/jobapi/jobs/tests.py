@@ -1,3 +1,967 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import itertools
+import os
+import socket
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import catalog, conditional, match_cache, search_index, tasks, utils, views
+
+from .benchmark import FakeGroqHandler, FakeGroqServer
+from .extraction import description_hash
+from .groq_client import CircuitBreaker, GroqClient, GroqError, GroqUnavailable
+from .models import Job, JobTombstone, MatchResult, MatchTask, Resume, ResumeText
+from .normalize import parse_location, parse_salary
+from .projection import JOB_PAYLOAD_FIELDS
+from .pagination import decode_cursor, encode_cursor
+from .prompt_budget import compact_text, strip_page_furniture, trim_job_boilerplate
+from .views import match_event_stream
+
+PAYLOAD = {"model": "test", "messages": [{"role": "user", "content": "hi"}]}
+
+
+class GroqStandInMixin:
+    def setUp(self):
+        self.server = FakeGroqServer(latency=0, error_rate=0).start()
+        self.addCleanup(self.server.stop)
+
+    def make_client(self, base_url=None):
+        client = GroqClient(
+            base_url=base_url or self.server.base_url,
+            api_key="test",
+            timeout=(1, 5),
+            max_retries=0,
+            requests_per_minute=60000,
+            burst=10,
+            failure_threshold=2,
+            reset_timeout=0.1,
+        )
+        self.addCleanup(client.session.close)
+        return client
+
+
+class CircuitBreakerTests(GroqStandInMixin, SimpleTestCase):
+    """
+    GroqClient's breaker against a local stand-in for the Groq API
+    """
+
+    def trip(self, client):
+        for _ in range(client.breaker.failure_threshold):
+            client.breaker.record_failure()
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_opens_after_consecutive_failures(self):
+        # Nothing listens on a stopped server's port
+        dead = FakeGroqServer()
+        dead.server_close()
+        client = self.make_client(dead.base_url)
+        for _ in range(2):
+            with self.assertRaisesRegex(GroqUnavailable, "Could not reach"):
+                client.chat(PAYLOAD)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaisesRegex(GroqUnavailable, "circuit is open"):
+            client.chat(PAYLOAD)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.server.latency = 0.3
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+
+        results = []
+        trial = threading.Thread(target=lambda: results.append(client.chat(PAYLOAD)))
+        trial.start()
+        time.sleep(0.1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaisesRegex(GroqUnavailable, "half-open"):
+            client.chat(PAYLOAD)
+        trial.join()
+
+        self.assertEqual(results[0].status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.server.calls, 1)
+
+    def test_failed_trial_reopens(self):
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+        self.server.error_rate = 1.0
+        with mock.patch("jobs.benchmark.random.choice", return_value=503):
+            self.assertEqual(client.chat(PAYLOAD).status_code, 503)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_recovers_after_reset_timeout(self):
+        client = self.make_client()
+        self.trip(client)
+        with self.assertRaisesRegex(GroqUnavailable, "circuit is open"):
+            client.chat(PAYLOAD)
+        time.sleep(0.15)
+        self.assertEqual(client.chat(PAYLOAD).status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(client.chat(PAYLOAD).status_code, 200)
+
+    def test_non_transport_error_during_trial_reopens(self):
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+        broken = requests.exceptions.ChunkedEncodingError("connection broken")
+        with mock.patch.object(client.session, "post", side_effect=broken):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                client.chat(PAYLOAD)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        # The next trial after the reset timeout reaches the server again
+        time.sleep(0.15)
+        self.assertEqual(client.chat(PAYLOAD).status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    @override_settings(GROQ_RATE_LIMIT_WAIT=0)
+    def test_limiter_timeout_does_not_start_a_trial(self):
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+        # Empty the bucket well below zero so nothing is due for a while
+        client.limiter.tokens = -100
+        client.limiter.updated = time.monotonic()
+        with self.assertRaisesRegex(GroqUnavailable, "rate limit"):
+            client.chat(PAYLOAD)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        client.limiter.tokens = client.limiter.capacity
+        client.limiter.updated = time.monotonic()
+        self.assertEqual(client.chat(PAYLOAD).status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_cancelled_async_trial_lets_the_next_call_try(self):
+        self.server.latency = 1
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+
+        async def cancel_trial():
+            task = asyncio.create_task(client.achat(PAYLOAD))
+            await asyncio.sleep(0.1)
+            self.assertEqual(client.breaker.state, CircuitBreaker.HALF_OPEN)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_trial())
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        self.server.latency = 0
+        self.assertEqual(asyncio.run(client.achat(PAYLOAD)).status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_non_transport_error_during_async_trial_reopens(self):
+        client = self.make_client()
+        self.trip(client)
+        time.sleep(0.15)
+        broken = httpx.DecodingError("bad gzip")
+        with mock.patch.object(httpx.AsyncClient, "post", side_effect=broken):
+            with self.assertRaises(httpx.DecodingError):
+                asyncio.run(client.achat(PAYLOAD))
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+
+class AsyncClientLifetimeTests(GroqStandInMixin, SimpleTestCase):
+    def test_client_is_shared_per_loop_and_closed_with_it(self):
+        client = self.make_client()
+        seen = []
+
+        async def call():
+            response = await client.achat(PAYLOAD)
+            seen.append(await client._async_client())
+            self.assertIs(await client._async_client(), seen[-1])
+            return response.status_code
+
+        for _ in range(2):
+            self.assertEqual(asyncio.run(call()), 200)
+        self.assertIsNot(seen[0], seen[1])
+        self.assertTrue(all(http.is_closed for http in seen))
+        self.assertEqual(client._async_clients, {})
+
+
+class StreamHandler(FakeGroqHandler):
+    """
+    Answer every call with the server's stream_lines as an SSE body
+    """
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = "".join(f"{line}\n\n" for line in self.server.stream_lines)
+        self._send(200, body.encode(), "text/event-stream")
+
+
+class StreamChatTests(GroqStandInMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.RequestHandlerClass = StreamHandler
+
+    def stream(self, client):
+        async def collect():
+            return [content async for content in client.astream_chat(PAYLOAD)]
+
+        return asyncio.run(collect())
+
+    def test_skips_chunks_without_choices(self):
+        self.server.stream_lines = [
+            'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+            'data: {"choices": [{"delta": {}}]}',
+            'data: {"choices": [{"delta": {"content": "lo"}}]}',
+            'data: {"choices": [], "usage": {"total_tokens": 12}}',
+            "data: [DONE]",
+        ]
+        self.assertEqual(self.stream(self.make_client()), ["Hel", "lo"])
+
+    def test_malformed_chunk_raises_groq_error(self):
+        for bad in ("data: {not json", 'data: {"choices": [null]}', "data: []"):
+            self.server.stream_lines = [
+                'data: {"choices": [{"delta": {"content": "Hi"}}]}',
+                bad,
+            ]
+            client = self.make_client()
+            with self.assertRaisesRegex(GroqError, "Malformed stream chunk"):
+                self.stream(client)
+            self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_event_stream_always_ends_with_a_terminal_event(self):
+        self.server.stream_lines = ["data: {not json"]
+        client = self.make_client()
+
+        async def events():
+            with mock.patch("jobs.matching.get_groq_client", return_value=client):
+                return [
+                    event
+                    async for event in match_event_stream("resume", "job description")
+                ]
+
+        body = asyncio.run(events())
+        self.assertTrue(body[-1].startswith("event: error\n"))
+
+    def test_event_stream_reports_unexpected_errors(self):
+        async def broken_match(resume_text, job_text):
+            yield "delta", {"content": "{"}
+            raise RuntimeError("boom")
+
+        async def events():
+            with mock.patch("jobs.views.astream_match", broken_match):
+                return [event async for event in match_event_stream("r", "j")]
+
+        with self.assertLogs("jobs.views", "ERROR"):
+            body = asyncio.run(events())
+        self.assertTrue(body[-1].startswith("event: error\n"))
+
+
+class CompactTextTests(SimpleTestCase):
+    def test_keeps_number_lines_and_repeats_in_page_bodies(self):
+        text = "Jane Doe\n9327486488\nAcme\n2019\nBuilt APIs\nGlobex\n2021\nBuilt APIs"
+        self.assertEqual(compact_text(text, 1000)[0], text)
+
+    def test_strips_page_numbers_and_running_headers_at_page_edges(self):
+        pages = [
+            "Jane Doe | jane@example.com\nAcme\n2019\nBuilt APIs\nAustin\nPage 1 of 3",
+            "Jane Doe | jane@example.com\nGlobex\n2021\nBuilt APIs\nDallas\n- 2 -",
+            "Jane Doe | jane@example.com\nEducation\n2017\n3 of 3",
+        ]
+        compacted = strip_page_furniture(pages)
+        self.assertEqual(compacted.count("Jane Doe"), 1)
+        self.assertEqual(compacted.count("Built APIs"), 2)
+        for kept in ("2019", "2021", "2017", "Education"):
+            self.assertIn(kept, compacted)
+        for dropped in ("Page 1", "- 2 -", "3 of 3"):
+            self.assertNotIn(dropped, compacted)
+
+    def test_benefits_section_runs_to_the_next_real_heading(self):
+        text = "\n".join(
+            [
+                "Build data pipelines.",
+                "Benefits",
+                "Dental",
+                "401(k) match",
+                "Gym stipend",
+                "Requirements",
+                "Python",
+                "WHAT WE OFFER",
+                "Free lunch",
+                "How you'll grow:",
+                "Mentorship",
+            ]
+        )
+        self.assertEqual(
+            trim_job_boilerplate(text),
+            "Build data pipelines.\nRequirements\nPython\nHow you'll grow:\nMentorship",
+        )
+
+
+class DescriptionHashTests(SimpleTestCase):
+    def test_ignores_whitespace_and_entities_but_not_case(self):
+        text = "Senior Go developer &amp; SRE.\n\n  Remote."
+        same = "Senior Go developer & SRE. Remote."
+        self.assertEqual(description_hash(text), description_hash(same))
+        self.assertNotEqual(description_hash(text), description_hash(text.lower()))
+
+
+class TempDirMixin:
+    def make_temp_dir(self):
+        path = tempfile.mkdtemp(prefix="jobapi-test-")
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        return Path(path)
+
+
+class PdfTextCacheTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        override = override_settings(PDF_TEXT_CACHE_DIR=self.make_temp_dir())
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_extracted_text_has_no_page_break_marker(self):
+        path = str(settings.BASE_DIR / "resumes" / "RESUME.pdf")
+        pages = ["Jane Doe\nAcme\nPage 1 of 2", "Jane Doe\nGlobex\nPage 2 of 2"]
+        with override_settings(PDF_MIN_TEXT_CHARS=1):
+            with mock.patch.object(utils, "iter_pdf_pages", return_value=pages):
+                text = utils.extract_text_from_pdf(path, raise_errors=True)
+        self.assertEqual(text, "Jane Doe\nAcme\nGlobex")
+
+    def test_second_extraction_is_a_cache_hit(self):
+        path = str(settings.BASE_DIR / "resumes" / "RESUME.pdf")
+        text = utils.extract_text_from_pdf(path, raise_errors=True)
+        hits = utils.pdf_text_cache_stats()["hits"]
+        with mock.patch.object(utils, "iter_pdf_pages", side_effect=AssertionError):
+            self.assertEqual(utils.extract_text_from_pdf(path), text)
+        self.assertEqual(utils.pdf_text_cache_stats()["hits"], hits + 1)
+
+    @override_settings(PDF_TEXT_CACHE_MAX_BYTES=250)
+    def test_evicts_least_recently_used_entries(self):
+        utils._write_cached_text("aa1", "a" * 100)
+        utils._write_cached_text("bb2", "b" * 100)
+        os.utime(utils._cache_path("bb2"), (1, 1))
+        self.assertIsNotNone(utils._read_cached_text("aa1"))
+
+        utils._write_cached_text("cc3", "c" * 100)
+        self.assertIsNotNone(utils._read_cached_text("aa1"))
+        self.assertIsNone(utils._read_cached_text("bb2"))
+        self.assertIsNotNone(utils._read_cached_text("cc3"))
+
+    def test_writes_under_the_limit_do_not_rescan(self):
+        utils._write_cached_text("aa1", "a")
+        scanner = mock.patch.object(
+            utils, "_cache_entries", wraps=utils._cache_entries
+        )
+        with scanner as scan:
+            for i in range(5):
+                utils._write_cached_text(f"b{i}", "b")
+        scan.assert_not_called()
+
+
+class JobsTestCase(TempDirMixin, TestCase):
+    """
+    Database tests with the search index and PDF text cache in a temp dir
+    """
+
+    def setUp(self):
+        temp = self.make_temp_dir()
+        override = override_settings(
+            JOB_INDEX_PATH=temp / "job_index.pickle",
+            PDF_TEXT_CACHE_DIR=temp / "pdf_text",
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_job(self, **fields):
+        values = {
+            "title": "Backend Engineer",
+            "company": "Acme",
+            "location": "Austin, TX",
+            "description": "Build Python services.",
+            "date_posted": timezone.now(),
+            **fields,
+        }
+        return Job.objects.create(**values)
+
+
+class MatchCacheTests(JobsTestCase):
+    def test_key_follows_job_text_and_prompt_version(self):
+        job = self.make_job()
+        key = match_cache.match_cache_key("r" * 64, job, "job text")
+        self.assertEqual(key, match_cache.match_cache_key("r" * 64, job, "job text"))
+        self.assertNotEqual(key, match_cache.match_cache_key("r" * 64, job, "new"))
+        self.assertNotEqual(key, match_cache.match_cache_key("s" * 64, job, "job text"))
+        with mock.patch.object(match_cache, "MATCH_PROMPT_VERSION", "test"):
+            self.assertNotEqual(
+                key, match_cache.match_cache_key("r" * 64, job, "job text")
+            )
+
+    def test_hit_counts_and_expiry(self):
+        job = self.make_job()
+        match_cache.store_match("k1", job, "r" * 64, "match text")
+        self.assertEqual(match_cache.get_cached_match("k1"), "match text")
+        self.assertEqual(MatchResult.objects.get(cache_key="k1").hits, 1)
+        self.assertIsNone(match_cache.get_cached_match("missing"))
+
+        old = timezone.now() - timedelta(seconds=settings.MATCH_CACHE_TTL_SECONDS + 1)
+        MatchResult.objects.filter(cache_key="k1").update(created_at=old)
+        self.assertIsNone(match_cache.get_cached_match("k1"))
+
+    @override_settings(MATCH_CACHE_MAX_ENTRIES=1, MATCH_CACHE_EVICT_EVERY=3)
+    def test_evicts_least_recently_used_every_n_writes(self):
+        job = self.make_job()
+        hour_ago = timezone.now() - timedelta(hours=1)
+        with mock.patch.object(match_cache, "_writes", itertools.count(1)):
+            for age, key in [(2, "old"), (1, "mid")]:
+                match_cache.store_match(key, job, "r" * 64, key)
+                MatchResult.objects.filter(cache_key=key).update(
+                    last_used_at=hour_ago - timedelta(hours=age)
+                )
+            # Over the limit, but the third write has not happened yet
+            self.assertEqual(MatchResult.objects.count(), 2)
+            match_cache.store_match("new", job, "r" * 64, "new")
+        self.assertEqual(
+            set(MatchResult.objects.values_list("cache_key", flat=True)),
+            {"new"},
+        )
+
+
+class SearchIndexTests(JobsTestCase):
+    def shortlist(self, text):
+        return [job_id for job_id, _ in search_index.shortlist_jobs(text)]
+
+    def fresh_process_shortlist(self, text):
+        # What another process sees: the snapshot plus the change log
+        state = dict(_index=None, _index_stamp=None, _log_seen=None, _log_records=0)
+        with mock.patch.multiple(search_index, **state):
+            return self.shortlist(text)
+
+    def test_index_follows_saves_and_deletes(self):
+        search_index.rebuild_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.make_job(title="Kotlin Developer")
+        self.assertEqual(self.shortlist("kotlin"), [job.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = "Haskell Developer"
+            job.save()
+        self.assertEqual(self.shortlist("kotlin"), [])
+        self.assertEqual(self.shortlist("haskell"), [job.pk])
+        self.assertEqual(self.fresh_process_shortlist("haskell"), [job.pk])
+
+        job_id = job.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.assertEqual(self.shortlist("haskell"), [])
+        self.assertEqual(self.fresh_process_shortlist("haskell"), [])
+        self.assertNotIn(job_id, search_index.get_index().doc_len)
+
+    def test_rolled_back_save_is_not_indexed(self):
+        search_index.rebuild_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.make_job(title="Erlang Developer")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.shortlist("erlang"), [])
+
+    @override_settings(JOB_INDEX_COMPACT_EVERY=2)
+    def test_change_log_is_folded_into_snapshot(self):
+        search_index.rebuild_index()
+        log_path = Path(settings.JOB_INDEX_PATH).with_suffix(".log")
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.make_job(title="Elixir Developer")
+        self.assertTrue(log_path.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self.make_job(title="Elixir Engineer")
+        self.assertFalse(log_path.exists())
+        self.assertCountEqual(
+            self.fresh_process_shortlist("elixir"), [first.pk, second.pk]
+        )
+
+
+class LoadCsvTests(JobsTestCase):
+    fields = ["title", "company", "place", "url", "description", "qualifications"]
+
+    def setUp(self):
+        super().setUp()
+        self.folder = self.make_temp_dir()
+
+    def write_csv(self, rows):
+        with open(self.folder / "jobs.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, self.fields)
+            writer.writeheader()
+            for url, title, description in rows:
+                writer.writerow(
+                    {
+                        "title": title,
+                        "company": "Acme",
+                        "place": "Remote",
+                        "url": url,
+                        "description": description,
+                        "qualifications": "['Python']",
+                    }
+                )
+
+    def load(self, *args):
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_csv", *args, folder=str(self.folder), workers=1, stdout=out
+            )
+        return out.getvalue()
+
+    def shortlist(self, text):
+        return {job_id for job_id, _ in search_index.shortlist_jobs(text)}
+
+    def test_upsert_by_url(self):
+        self.write_csv(
+            [
+                ("https://jobs.example/1", "Rust Developer", "Write Rust."),
+                ("https://jobs.example/2", "Go Developer", "Write Go."),
+            ]
+        )
+        self.assertIn("2 created", self.load())
+        self.write_csv(
+            [
+                ("https://jobs.example/1", "Rust Developer", "Write Rust and Zig."),
+                ("https://jobs.example/2", "Go Developer", "Write Go."),
+            ]
+        )
+        output = self.load()
+        self.assertIn("0 created, 1 updated, 1 unchanged", output)
+        job = Job.objects.get(url="https://jobs.example/1")
+        self.assertEqual(job.description, "Write Rust and Zig.")
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(self.shortlist("zig"), {job.pk})
+
+    def test_unchanged_load_leaves_index_alone(self):
+        self.write_csv([("https://jobs.example/1", "Rust Developer", "Write Rust.")])
+        self.load()
+        search_index.get_index()
+        with mock.patch.object(search_index, "rebuild_index") as rebuild:
+            with mock.patch.object(search_index, "_reindex_jobs") as reindex:
+                self.assertIn("1 unchanged", self.load())
+        rebuild.assert_not_called()
+        reindex.assert_not_called()
+
+    def test_prune_deletes_jobs_missing_from_csv(self):
+        self.write_csv(
+            [
+                ("https://jobs.example/1", "Rust Developer", "Write Rust."),
+                ("https://jobs.example/2", "Go Developer", "Write Go."),
+            ]
+        )
+        self.load()
+        gone = Job.objects.get(url="https://jobs.example/2").pk
+        self.write_csv([("https://jobs.example/1", "Rust Developer", "Write Rust.")])
+
+        self.assertIn("0 deleted", self.load())
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertIn("1 deleted", self.load("--prune"))
+        self.assertFalse(Job.objects.filter(pk=gone).exists())
+        self.assertTrue(JobTombstone.objects.filter(job_id=gone).exists())
+        self.assertEqual(self.shortlist("go"), set())
+
+
+class CursorPaginationTests(JobsTestCase):
+    def page(self, cursor="", **params):
+        response = self.client.get(
+            reverse("paginated-jobs"), {"cursor": cursor, "fields": "id", **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(42)), 42)
+        self.assertIsNone(decode_cursor(None))
+        for bad in ("not-a-cursor", encode_cursor("42")):
+            with self.assertRaises(ValueError):
+                decode_cursor(bad)
+
+    def test_walk_is_stable_while_jobs_are_inserted(self):
+        for snapshot in (False, True):
+            with self.subTest(snapshot=snapshot):
+                Job.objects.all().delete()
+                original = [self.make_job(title=f"Job {i}").pk for i in range(5)]
+                seen, cursor = [], ""
+                with override_settings(JOB_CATALOG_SNAPSHOT=snapshot):
+                    while cursor is not None:
+                        data = self.page(cursor, page_size=2)
+                        seen += [job["id"] for job in data["jobs"]]
+                        cursor = data["next_cursor"]
+                        if len(seen) < len(original):
+                            # New rows land after the cursor, never before it
+                            self.make_job(title="Inserted")
+                self.assertEqual(len(seen), len(set(seen)))
+                self.assertEqual(seen[: len(original)], original)
+                self.assertEqual(seen, sorted(seen))
+                all_ids = Job.objects.values_list("id", flat=True)
+                self.assertEqual(set(seen), set(all_ids))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("paginated-jobs"), {"cursor": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+
+class JobChangesTests(JobsTestCase):
+    def changes(self, cursor=None, **params):
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = self.client.get(reverse("job-changes"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_feed_reports_updates_and_deletes_since_cursor(self):
+        kept = self.make_job(title="Kept")
+        dropped = self.make_job(title="Dropped")
+        full = self.changes()
+        self.assertEqual([job["id"] for job in full["upserted"]], [kept.pk, dropped.pk])
+        self.assertEqual(full["deleted"], [])
+        self.assertFalse(full["has_more"])
+
+        quiet = self.changes(full["next_cursor"])
+        self.assertEqual((quiet["upserted"], quiet["deleted"]), ([], []))
+
+        kept.title = "Kept and edited"
+        kept.save()
+        dropped_id = dropped.pk
+        dropped.delete()
+        later = self.changes(full["next_cursor"])
+        self.assertEqual([job["id"] for job in later["upserted"]], [kept.pk])
+        self.assertEqual(later["upserted"][0]["title"], "Kept and edited")
+        self.assertEqual(later["deleted"], [dropped_id])
+
+        done = self.changes(later["next_cursor"])
+        self.assertEqual((done["upserted"], done["deleted"]), ([], []))
+
+    def test_full_sync_skips_old_tombstones(self):
+        self.make_job().delete()
+        self.assertEqual(self.changes()["deleted"], [])
+
+    def test_limit_pages_through_tombstones(self):
+        ids = [self.make_job().pk for _ in range(3)]
+        cursor = self.changes()["next_cursor"]
+        for job in Job.objects.order_by("id"):
+            job.delete()
+
+        deleted = []
+        while True:
+            data = self.changes(cursor, limit=2)
+            deleted += data["deleted"]
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                break
+        self.assertEqual(deleted, ids)
+
+    def test_bad_cursor_and_limit(self):
+        for params in ({"cursor": "nope"}, {"limit": "0"}):
+            response = self.client.get(reverse("job-changes"), params)
+            self.assertEqual(response.status_code, 400)
+
+
+class ConditionalTests(JobsTestCase):
+    def test_get_revalidates_and_post_skips_validators(self):
+        self.make_job()
+        url = reverse("paginated-jobs")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        with mock.patch.object(conditional, "catalog_state") as state:
+            response = self.client.post(url, "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        state.assert_not_called()
+
+
+class BatchMatchTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        media = override_settings(MEDIA_ROOT=self.make_temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+
+    @override_settings(GROQ_MAX_CONCURRENCY=2)
+    async def test_streams_results_as_they_complete(self):
+        resume = await Resume.objects.acreate(
+            file=SimpleUploadedFile("resume.pdf", b"%PDF-1.4 test")
+        )
+        await ResumeText.objects.acreate(
+            resume=resume, status=ResumeText.READY, text="Python developer"
+        )
+        jobs = [
+            await Job.objects.acreate(
+                title=f"Job {i}",
+                company="Acme",
+                location="Remote",
+                date_posted=timezone.now(),
+            )
+            for i in range(4)
+        ]
+        delays = {jobs[0].pk: 0.2, jobs[1].pk: 0, jobs[2].pk: 0, jobs[3].pk: 0}
+        running, peak = 0, 0
+
+        async def fake_match(resume, job, resume_hash, resume_text):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(delays[job.pk])
+            running -= 1
+            return {"job_id": job.pk, "match": resume_text}
+
+        with mock.patch.object(views, "amatch_result_line", fake_match):
+            response = await self.async_client.post(
+                reverse("find-compatible-jobs-batch"),
+                {"resume_id": resume.pk, "job_ids": [job.pk for job in jobs]},
+                content_type="application/json",
+            )
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+
+        self.assertEqual(peak, 2)
+        # The slow first job finishes last even though it started first
+        self.assertEqual(lines[-2]["job_id"], jobs[0].pk)
+        self.assertEqual(lines[-1], {"done": True, "count": 4})
+        self.assertEqual({line["match"] for line in lines[:-1]}, {"Python developer"})
+
+
+def resolves_to(*addresses):
+    infos = [
+        (socket.AF_INET6 if ":" in a else socket.AF_INET, 1, 6, "", (a, 0))
+        for a in addresses
+    ]
+    return mock.patch.object(tasks.socket, "getaddrinfo", return_value=infos)
+
+
+class CallbackUrlTests(SimpleTestCase):
+    def test_rejects_non_public_addresses(self):
+        blocked = [
+            "127.0.0.1",
+            "10.0.0.5",
+            "169.254.169.254",
+            "::1",
+            "fe80::1%eth0",
+            "::ffff:192.168.1.1",
+            "224.0.0.1",
+        ]
+        for address in blocked:
+            with self.subTest(address=address), resolves_to(address):
+                with self.assertRaises(ValueError):
+                    tasks.check_callback_url("https://hooks.example.com/done")
+
+    def test_rejects_a_host_with_any_private_address(self):
+        with resolves_to("93.184.216.34", "10.0.0.5"):
+            with self.assertRaises(ValueError):
+                tasks.check_callback_url("https://hooks.example.com/done")
+
+    def test_accepts_public_addresses(self):
+        with resolves_to("93.184.216.34", "2606:2800:220:1::1"):
+            tasks.check_callback_url("https://hooks.example.com/done")
+
+    def test_rejects_other_schemes_and_unresolvable_hosts(self):
+        for url in ("ftp://hooks.example.com/", "file:///etc/passwd", "http://"):
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                tasks.check_callback_url(url)
+        failure = socket.gaierror("no such host")
+        with mock.patch.object(tasks.socket, "getaddrinfo", side_effect=failure):
+            with self.assertRaises(ValueError):
+                tasks.check_callback_url("https://nowhere.invalid/")
+
+    @override_settings(MATCH_TASK_CALLBACK_ALLOWED_HOSTS=["hooks.internal"])
+    def test_allowed_hosts_skip_resolution(self):
+        with resolves_to("10.0.0.5") as resolve:
+            tasks.check_callback_url("http://hooks.internal./done")
+        resolve.assert_not_called()
+
+
+@override_settings(MATCH_TASK_MAX_ATTEMPTS=2, MATCH_TASK_TIMEOUT_SECONDS=60)
+class MatchTaskQueueTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.resume = Resume.objects.create(file="resumes/resume.pdf")
+        self.job = self.make_job()
+
+    def make_task(self, **fields):
+        return MatchTask.objects.create(resume=self.resume, job=self.job, **fields)
+
+    def test_claims_oldest_runnable_task_once(self):
+        now = timezone.now()
+        later = self.make_task(run_after=now - timedelta(seconds=1))
+        first = self.make_task(run_after=now - timedelta(seconds=5))
+        self.make_task(run_after=now + timedelta(hours=1))
+
+        claimed = tasks.claim_next_task()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (MatchTask.RUNNING, 1))
+        self.assertEqual(tasks.claim_next_task().pk, later.pk)
+        self.assertIsNone(tasks.claim_next_task())
+
+    def test_requeues_stale_tasks_and_fails_exhausted_ones(self):
+        old = timezone.now() - timedelta(minutes=5)
+        stale = self.make_task(status=MatchTask.RUNNING, started_at=old, attempts=1)
+        exhausted = self.make_task(status=MatchTask.RUNNING, started_at=old, attempts=2)
+        fresh = self.make_task(
+            status=MatchTask.RUNNING, started_at=timezone.now(), attempts=1
+        )
+
+        self.assertEqual(tasks.requeue_stale_tasks(), 1)
+        statuses = dict(MatchTask.objects.values_list("id", "status"))
+        self.assertEqual(statuses[stale.pk], MatchTask.QUEUED)
+        self.assertEqual(statuses[exhausted.pk], MatchTask.FAILED)
+        self.assertEqual(statuses[fresh.pk], MatchTask.RUNNING)
+
+    def test_failed_match_is_retried_then_failed(self):
+        self.make_task()
+        failure = ({"match": "Groq is down", "cached": False}, False)
+        with mock.patch.object(tasks, "resolve_match", return_value=failure):
+            task = tasks.run_task(tasks.claim_next_task())
+            self.assertEqual(task.status, MatchTask.QUEUED)
+            self.assertGreater(task.run_after, timezone.now())
+
+            MatchTask.objects.update(run_after=timezone.now())
+            task = tasks.run_task(tasks.claim_next_task())
+        self.assertEqual(task.status, MatchTask.FAILED)
+        self.assertEqual(task.error, "Groq is down")
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_parse_salary(self):
+        cases = {
+            "Estimated: $90K - $113K a year": (90000, 113000, "year"),
+            "$60 - $65 an hour": (124800, 135200, "hour"),
+            "$113K - $90K": (90000, 113000, "year"),
+            "$4,500.50 per month": (54006, 54006, "month"),
+            "Up to $5,000 a month": (None, 60000, "month"),
+            "From $25 an hour": (52000, None, "hour"),
+            "$1.2M/year": (1200000, 1200000, "year"),
+            "Competitive": (None, None, ""),
+            "": (None, None, ""),
+            None: (None, None, ""),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary(text), expected)
+
+    def test_parse_location(self):
+        cases = {
+            "Austin, TX": ("Austin", "TX", "US", False),
+            "New York,  NY": ("New York", "NY", "US", False),
+            "California": ("", "CA", "US", False),
+            "Toronto, Canada": ("Toronto", "", "CA", False),
+            "United States": ("", "", "US", False),
+            "Remote": ("", "", "", True),
+            "Hybrid remote in Denver, CO": ("Denver", "CO", "US", True),
+            "Remote in Texas": ("", "TX", "US", True),
+            "": ("", "", "", False),
+        }
+        for text, (city, region, country, is_remote) in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(
+                    parse_location(text),
+                    {
+                        "city": city,
+                        "region": region,
+                        "country": country,
+                        "is_remote": is_remote,
+                    },
+                )
+
+
+class JobNormalizedFieldsTests(JobsTestCase):
+    def test_save_keeps_parsed_columns_in_step(self):
+        job = self.make_job(salary="$50 an hour", location="Remote in Austin, TX")
+        job.refresh_from_db()
+        self.assertEqual((job.salary_min, job.salary_period), (104000, "hour"))
+        self.assertEqual((job.city, job.region, job.is_remote), ("Austin", "TX", True))
+
+        job.salary = "$120K - $150K a year"
+        job.location = "Denver, CO"
+        job.save(update_fields=["salary", "location"])
+        job.refresh_from_db()
+        self.assertEqual((job.salary_min, job.salary_max), (120000, 150000))
+        self.assertEqual((job.city, job.region, job.is_remote), ("Denver", "CO", False))
+
+
+@override_settings(JOB_CATALOG_PATCH_MAX_FRACTION=1)
+class CatalogParityTests(JobsTestCase):
+    criteria = [
+        {},
+        {"min_salary": "100000"},
+        {"max_salary": "80000"},
+        {"min_salary": "90000", "max_salary": "130000"},
+        {"salary_period": "hour"},
+        {"city": "austin"},
+        {"region": "tx"},
+        {"country": "us", "remote": "false"},
+        {"remote": "true"},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = [
+            self.make_job(salary="$90K - $113K a year", location="Austin, TX"),
+            self.make_job(salary="$60 - $65 an hour", location="Remote in Denver, CO"),
+            self.make_job(salary="Up to $75,000 a year", location="AUSTIN, TX"),
+            self.make_job(salary="From $140K", location="Toronto, Canada"),
+            self.make_job(salary="", location="Remote", description=""),
+            self.make_job(
+                salary="$120,000",
+                location="Dallas, Texas",
+                description="Long description. " * 30,
+                skills=["Python", "Django"],
+            ),
+        ]
+
+    def page(self, snapshot, description, params):
+        query = {
+            "cursor": "",
+            "page_size": 100,
+            "fields": ",".join(JOB_PAYLOAD_FIELDS),
+            "description": description,
+            **params,
+        }
+        with override_settings(JOB_CATALOG_SNAPSHOT=snapshot):
+            response = self.client.get(reverse("paginated-jobs"), query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_same_as_orm(self):
+        for params in self.criteria:
+            for description in ("full", "snippet", "none"):
+                with self.subTest(params=params, description=description):
+                    self.assertEqual(
+                        self.page(True, description, params),
+                        self.page(False, description, params),
+                    )
+
+    def test_filters_and_projection_match_the_orm(self):
+        self.assert_same_as_orm()
+        # Spot check that the filters select something
+        austin = self.page(False, "none", {"city": "austin"})["jobs"]
+        self.assertEqual(len(austin), 2)
+
+    def test_patched_snapshot_matches_the_orm(self):
+        self.page(True, "none", {})
+        self.jobs[0].salary = "$50 an hour"
+        self.jobs[0].save()
+        self.jobs[1].delete()
+        self.make_job(salary="$200K", location="Austin, TX")
+        with mock.patch.object(catalog.JobCatalog, "build", side_effect=AssertionError):
+            self.assert_same_as_orm()
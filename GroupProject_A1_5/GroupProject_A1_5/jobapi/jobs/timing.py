@@ -0,0 +1,172 @@
+"""
+Where a request's time goes: phase timings for the Server-Timing header and
+process-wide histograms for the Prometheus /api/metrics/ endpoint.
+
+TimingMiddleware opens a RequestTimings for each request in a context
+variable; phase("pdf"), phase("prompt"), phase("groq") and the DB query
+hook add to it from wherever the work runs, including sync_to_async and
+asyncio.to_thread threads, which inherit the context. Outside a request
+(management commands, worker processes) phase() does nothing.
+
+Histograms are per process: with several server processes, each one's
+/api/metrics/ reports only its own requests.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases reported in Server-Timing, in this order, when they occurred
+PHASES = ("db", "pdf", "prompt", "groq")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self.lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """
+        Server-Timing header value; durations in milliseconds, summed over
+        every occurrence of a phase
+        """
+        entries = []
+        for name in PHASES:
+            if name in self.durations:
+                entries.append(
+                    f'{name};dur={self.durations[name] * 1000:.1f}'
+                    f';desc="{self.counts[name]}x"'
+                )
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def start_request():
+    """
+    Begin timing a request; returns (timings, token for finish_request)
+    """
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """
+    Add the time spent in the block to the current request's phase
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing each query into the "db" phase
+    """
+    with phase("db"):
+        return execute(sql, params, many, context)
+
+
+def _label_text(labels):
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return ",".join(f'{key}="{value}"' for key, value in escaped)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with labels, rendered in the Prometheus text
+    exposition format
+    """
+
+    def __init__(self, name, description, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = sorted(self.series.items())
+            series = [(key, list(values)) for key, values in series]
+        for key, values in series:
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, values):
+                le = _label_text(labels + [("le", f"{bound:g}")])
+                lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            le = _label_text(labels + [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{{{le}}} {values[-2]}")
+            label_text = _label_text(labels)
+            lines.append(f"{self.name}_count{{{label_text}}} {values[-2]}")
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-1]:.6f}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "jobapi_request_duration_seconds",
+    "Time from request to response headers, by view, method and status.",
+    ("view", "method", "status"),
+)
+PHASE_DURATION = Histogram(
+    "jobapi_request_phase_seconds",
+    "Time a request spent in each phase (db, pdf, prompt, groq), by view.",
+    ("view", "phase"),
+)
+
+
+def observe_request(timings, view, method, status):
+    REQUEST_DURATION.observe(timings.elapsed(), view=view, method=method, status=status)
+    with timings.lock:
+        durations = dict(timings.durations)
+    for name, seconds in durations.items():
+        PHASE_DURATION.observe(seconds, view=view, phase=name)
+
+
+def render_metrics():
+    lines = REQUEST_DURATION.render() + PHASE_DURATION.render()
+    return "\n".join(lines) + "\n"
@@ -3,20 +3,44 @@ from .views import (
     ResumeUploadView,
     compatible_jobs_page,
     groq_match,
+    groq_match_batch,
     paginated_jobs,
     groq_match_resume_job,
     extract_job_data,
+    extract_job_data_batch,
+)
+from .metrics_views import metrics
+from .task_views import match_task_status, submit_match_task
+from .resume_views import get_resume, pdf_cache_stats
+from .job_views import (
+    get_job,
+    job_changes,
+    search_jobs,
+    shortlist_jobs_for_resume,
+    skill_rank_jobs,
 )
-from .resume_views import get_resume
-from .job_views import get_job
 
 urlpatterns = [
     path("upload_resume/", ResumeUploadView.as_view(), name="resume-upload"),
     path("find_jobs/", groq_match, name="find-compatible-jobs"),
+    path("find_jobs_batch/", groq_match_batch, name="find-compatible-jobs-batch"),
+    path("submit_match_task/", submit_match_task, name="submit-match-task"),
+    path("match_task_status/", match_task_status, name="match-task-status"),
     path("find_jobs_page/", compatible_jobs_page, name="find-compatible-jobs-page"),
     path("get_resume/", get_resume, name="get-resume"),
+    path("pdf_cache_stats/", pdf_cache_stats, name="pdf-cache-stats"),
+    path("metrics/", metrics, name="metrics"),
     path("get_job/", get_job, name="get-job"),
+    path("job_changes/", job_changes, name="job-changes"),
+    path("search_jobs/", search_jobs, name="search-jobs"),
+    path("shortlist_jobs/", shortlist_jobs_for_resume, name="shortlist-jobs"),
+    path("skill_rank/", skill_rank_jobs, name="skill-rank"),
     path("paginated_jobs/", paginated_jobs, name="paginated-jobs"),
     path("match_resume_job/", groq_match_resume_job, name="match-resume-job"),
     path("extract_job_data/", extract_job_data, name="extract-job-data"),
+    path(
+        "extract_job_data_batch/",
+        extract_job_data_batch,
+        name="extract-job-data-batch",
+    ),
 ]
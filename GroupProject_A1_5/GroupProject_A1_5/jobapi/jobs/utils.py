@@ -1,15 +1,352 @@
+import hashlib
+import math
+import multiprocessing
+import os
+import string
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pdfplumber
+from django.conf import settings
+
+try:
+    import pypdf
+except ImportError:  # optional fast engine
+    pypdf = None
+
+from .prompt_budget import strip_page_furniture
+from .timing import phase
+
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Per cache dir: [bytes as of the last scan plus this process's writes since,
+# writes since that scan]. The directory is only rescanned (and evicted from)
+# once the running total passes the limit, or every PDF_TEXT_CACHE_RESCAN_WRITES
+# writes to pick up what other processes added.
+_cache_totals = {}
+PDF_TEXT_CACHE_RESCAN_WRITES = 100
+
+_engine_lock = threading.Lock()
+_engine_stats = {}
+
+_page_executor = None
+_page_executor_lock = threading.Lock()
 
+# Bump when the layout of extracted text changes, to invalidate cached text
+PDF_TEXT_FORMAT = 3
 
-def extract_text_from_pdf(file_path):
+
+def file_sha256(file_path):
     """
-    Extract text from a PDF file using pdfplumber
+    Return the SHA-256 hex digest of a file's contents
     """
-    text = ""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(digest):
+    cache_dir = Path(settings.PDF_TEXT_CACHE_DIR)
+    return cache_dir / digest[:2] / f"{digest}-{pdf_extractor_version()}.txt"
+
+
+def _read_cached_text(digest):
+    path = _cache_path(digest)
     try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        with _cache_lock:
+            _cache_stats["misses"] += 1
+        return None
+    # Touch the entry so eviction treats it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    with _cache_lock:
+        _cache_stats["hits"] += 1
+    return text
+
+
+def _write_cached_text(digest, text):
+    path = _cache_path(digest)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+        _count_cached_write(path.stat().st_size)
+    except OSError:
+        # The cache is an optimisation; never fail an extraction because of it
+        pass
+
+
+def _count_cached_write(size):
+    cache_dir = str(settings.PDF_TEXT_CACHE_DIR)
+    with _cache_lock:
+        total = _cache_totals.get(cache_dir)
+        if total is not None:
+            total[0] += size
+            total[1] += 1
+            if (
+                total[0] <= settings.PDF_TEXT_CACHE_MAX_BYTES
+                and total[1] < PDF_TEXT_CACHE_RESCAN_WRITES
+            ):
+                return
+    remaining = _evict_cached_text()
+    with _cache_lock:
+        _cache_totals[cache_dir] = [remaining, 0]
+
+
+def _cache_entries():
+    cache_dir = Path(settings.PDF_TEXT_CACHE_DIR)
+    if not cache_dir.exists():
+        return []
+    entries = []
+    for path in cache_dir.glob("*/*.txt"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _evict_cached_text():
+    """
+    Drop least recently used entries until the cache fits
+    PDF_TEXT_CACHE_MAX_BYTES; returns the bytes left
+    """
+    entries = _cache_entries()
+    total = sum(size for _, size, _ in entries)
+    if total <= settings.PDF_TEXT_CACHE_MAX_BYTES:
+        return total
+    for _, size, path in sorted(entries):
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        with _cache_lock:
+            _cache_stats["evictions"] += 1
+        if total <= settings.PDF_TEXT_CACHE_MAX_BYTES:
+            break
+    return total
+
+
+def pdf_text_cache_stats():
+    """
+    Return hit/miss counters for this process plus the on-disk cache size
+    """
+    entries = _cache_entries()
+    with _cache_lock:
+        stats = dict(_cache_stats)
+    stats["entries"] = len(entries)
+    stats["bytes"] = sum(size for _, size, _ in entries)
+    stats["extractor_version"] = pdf_extractor_version()
+    return stats
+
+
+class PdfplumberEngine:
+    """
+    Full layout analysis; slow but copes with most PDFs
+    """
+
+    name = "pdfplumber"
+    version = 1
+
+    def is_available(self):
+        return True
+
+    def page_count(self, file_path):
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+
+    def extract_pages(self, file_path, start=0, stop=None):
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += (page.extract_text() or "") + "\n"
-        return text.strip()
+            for page in pdf.pages[start:stop]:
+                yield page.extract_text() or ""
+
+
+class PypdfEngine:
+    """
+    Text-only extraction straight from the content streams, no layout pass
+    """
+
+    name = "pypdf"
+    version = 1
+
+    def is_available(self):
+        return pypdf is not None
+
+    def page_count(self, file_path):
+        return len(pypdf.PdfReader(file_path).pages)
+
+    def extract_pages(self, file_path, start=0, stop=None):
+        reader = pypdf.PdfReader(file_path)
+        for page in reader.pages[start:stop]:
+            yield page.extract_text() or ""
+
+
+PDF_ENGINES = {
+    engine.name: engine for engine in (PypdfEngine(), PdfplumberEngine())
+}
+
+
+def get_pdf_engines():
+    """
+    Return the installed engines from settings.PDF_TEXT_ENGINES, fastest first
+    """
+    return [
+        PDF_ENGINES[name]
+        for name in settings.PDF_TEXT_ENGINES
+        if name in PDF_ENGINES and PDF_ENGINES[name].is_available()
+    ]
+
+
+def pdf_extractor_version():
+    """
+    Identify the engine chain and text format so cached text is invalidated
+    when either changes
+    """
+    engines = "+".join(
+        f"{engine.name}-{engine.version}" for engine in get_pdf_engines()
+    )
+    return f"{engines}+text-{PDF_TEXT_FORMAT}"
+
+
+def _looks_like_text(text):
+    """
+    Reject output that is empty or mostly undecodable glyphs, e.g. (cid:72)
+    """
+    compact = "".join(text.split())
+    if len(compact) < settings.PDF_MIN_TEXT_CHARS or "(cid:" in compact:
+        return False
+    readable = sum(1 for ch in compact if ch.isalnum() or ch in string.punctuation)
+    return readable / len(compact) >= 0.9
+
+
+def _record_engine_timing(name, elapsed, accepted):
+    with _engine_lock:
+        stats = _engine_stats.setdefault(
+            name, {"calls": 0, "rejected": 0, "total_ms": 0.0}
+        )
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed * 1000
+        if not accepted:
+            stats["rejected"] += 1
+
+
+def pdf_engine_stats():
+    """
+    Return per-engine call counts, fallbacks and average latency for this process
+    """
+    with _engine_lock:
+        report = {name: dict(stats) for name, stats in _engine_stats.items()}
+    for stats in report.values():
+        stats["avg_ms"] = round(stats["total_ms"] / stats["calls"], 2)
+        stats["total_ms"] = round(stats["total_ms"], 2)
+    return report
+
+
+def _get_page_executor():
+    global _page_executor
+    with _page_executor_lock:
+        if _page_executor is None:
+            _page_executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _page_executor
+
+
+def _extract_page_range(engine_name, file_path, start, stop):
+    return list(PDF_ENGINES[engine_name].extract_pages(file_path, start, stop))
+
+
+def iter_pdf_pages(file_path, parallel=None, engine=None):
+    """
+    Yield the text of each page of a PDF in order.
+
+    With parallel=True the pages are split into contiguous ranges and parsed
+    across a process pool; pages are still yielded in order as soon as their
+    range is done. parallel=None picks the pool only for documents with at
+    least PDF_PARALLEL_MIN_PAGES pages. engine defaults to the first
+    configured engine.
+    """
+    engine = engine or get_pdf_engines()[0]
+    page_count = engine.page_count(file_path)
+    if parallel is None:
+        parallel = page_count >= settings.PDF_PARALLEL_MIN_PAGES
+    if not parallel or page_count < 2:
+        yield from engine.extract_pages(file_path)
+        return
+
+    executor = _get_page_executor()
+    chunk_size = math.ceil(page_count / settings.PDF_PARALLEL_WORKERS)
+    futures = [
+        executor.submit(
+            _extract_page_range, engine.name, file_path, start, start + chunk_size
+        )
+        for start in range(0, page_count, chunk_size)
+    ]
+    for future in futures:
+        yield from future.result()
+
+
+@phase("pdf")
+def extract_text_from_pdf(file_path, raise_errors=False, parallel=None):
+    """
+    Extract text from a PDF file, without page numbers or running
+    headers/footers.
+
+    Engines from settings.PDF_TEXT_ENGINES are tried fastest first; the next
+    one is used only when the output is empty or garbled. Results are cached
+    on disk keyed by the SHA-256 of the PDF bytes, so the same resume is only
+    parsed once no matter how often it is matched. Failures are returned as
+    an error string unless raise_errors is set.
+    """
+    try:
+        digest = file_sha256(file_path)
+        cached = _read_cached_text(digest)
+        if cached is not None:
+            return cached
+
+        engines = get_pdf_engines()
+        text = ""
+        for position, engine in enumerate(engines):
+            start = time.perf_counter()
+            try:
+                pages = iter_pdf_pages(file_path, parallel=parallel, engine=engine)
+                text = strip_page_furniture(list(pages)).strip()
+            except Exception:
+                _record_engine_timing(engine.name, time.perf_counter() - start, False)
+                if position == len(engines) - 1:
+                    raise
+                continue
+            accepted = _looks_like_text(text)
+            _record_engine_timing(engine.name, time.perf_counter() - start, accepted)
+            if accepted:
+                break
     except Exception as e:
+        if raise_errors:
+            raise
         return f"Error extracting PDF: {str(e)}"
+
+    _write_cached_text(digest, text)
+    return text
+
+
+def extract_resume_text(file_path, parallel=None):
+    """
+    Return the text of a resume file, raising if it cannot be read
+    """
+    if file_path.lower().endswith(".pdf"):
+        return extract_text_from_pdf(file_path, raise_errors=True, parallel=parallel)
+    # fallback for non-pdf files
+    with open(file_path, encoding="utf-8") as f:
+        return f.read()
@@ -1,9 +1,12 @@
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.db.models import Q
 from django.shortcuts import render
+import asyncio
 import json
+import logging
 import os
-import requests
 from dotenv import load_dotenv
 from rest_framework import generics
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -11,18 +14,71 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Job, Resume
 from .serializer import JobSerializer, ResumeSerializer
-from .utils import extract_text_from_pdf
+from .utils import extract_text_from_pdf, file_sha256
+from .resume_text import aget_resume_text, enqueue_resume_extraction
+from .extraction import ExtractionError, aextract_job_data, aextract_job_data_batch
+from .groq_client import GroqUnavailable
+from .matching import (
+    amatch_result_line,
+    amatch_resume_to_job,
+    arequest_match,
+    astream_match,
+)
+from .catalog import get_catalog
+from .conditional import catalog_state, jobs_list_etag, jobs_list_last_modified
+from .filters import clean_job_filters, filter_jobs
+from .pagination import decode_cursor, encode_cursor
+from .projection import (
+    PAGINATED_JOB_FIELDS,
+    parse_description_mode,
+    parse_fields,
+    project_jobs,
+    serialize_job,
+)
 import tempfile
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def match_event_stream(resume_text, job_description):
+    # A comment line goes out at once so the browser sees the first byte
+    # before Groq has produced anything
+    yield ": stream open\n\n"
+    try:
+        async for event, data in astream_match(resume_text, job_description):
+            yield sse_event(event, data)
+    except Exception:
+        # The client has a 200 already; it must still get a terminal event
+        logger.exception("Match stream failed")
+        yield sse_event("error", {"error": "The match stream failed unexpectedly."})
 
 
 @csrf_exempt
-def groq_match_resume_job(request):
-    print("\n--- RESUME MATCHING API ENDPOINT CALLED ---")
-    print(f"Request method: {request.method}")
-    print(f"Content type: {request.content_type}")
-    print(f"POST data keys: {list(request.POST.keys())}")
-    print(f"FILES keys: {list(request.FILES.keys())}")
+async def groq_match_resume_job(request):
+    """
+    Match an uploaded resume against a job description.
+
+    Send stream=true (or Accept: text/event-stream) to get Server-Sent
+    Events instead: "delta" events carry Groq's tokens as they arrive and a
+    final "result" (or "error") event carries the full match and its parsed
+    JSON. Streaming needs an ASGI server; under runserver the events arrive
+    all at once.
+    """
+    logger.debug(
+        "match_resume_job called",
+        extra={
+            "method": request.method,
+            "content_type": request.content_type,
+            "post_keys": list(request.POST.keys()),
+            "file_keys": list(request.FILES.keys()),
+        },
+    )
 
     # Handle preflight OPTIONS request
     if request.method == "OPTIONS":
@@ -37,102 +93,50 @@ def groq_match_resume_job(request):
         resume_file = request.FILES.get("resume")
         job_description = request.POST.get("job_description")
 
-        print(f"Resume file received: {resume_file is not None}")
-        if resume_file:
-            print(
-                f"Resume file name: {resume_file.name}, size: {resume_file.size} bytes"
-            )
-        print(f"Job description received: {job_description is not None}")
-        if job_description:
-            print(f"Job description length: {len(job_description)} characters")
+        logger.info(
+            "match_resume_job request",
+            extra={
+                "resume_file": resume_file.name if resume_file else None,
+                "resume_bytes": resume_file.size if resume_file else None,
+                "job_description_chars": len(job_description or ""),
+            },
+        )
 
         if not resume_file or not job_description:
             error_msg = f"Missing {'resume file' if not resume_file else ''}{' and ' if not resume_file and not job_description else ''}{'job description' if not job_description else ''}"
-            print(f"ERROR: {error_msg}")
+            logger.warning("match_resume_job rejected: %s", error_msg)
             return JsonResponse({"error": error_msg}, status=400)
 
         # Save the uploaded resume temporarily
-        print("Saving resume to temporary file...")
-
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
             for chunk in resume_file.chunks():
                 tmp.write(chunk)
             resume_path = tmp.name
-            print(f"Resume saved to temporary file: {resume_path}")
 
         try:
-            print("Extracting text from PDF...")
-            resume_text = extract_text_from_pdf(resume_path)
-            print(f"Successfully extracted {len(resume_text)} characters from resume")
+            resume_text = await asyncio.to_thread(extract_text_from_pdf, resume_path)
+            logger.debug(
+                "Resume text extracted", extra={"resume_chars": len(resume_text)}
+            )
         except Exception as e:
             error_msg = f"Failed to extract text from resume: {str(e)}"
-            print(f"ERROR: {error_msg}")
+            logger.warning(error_msg)
             return JsonResponse({"error": error_msg}, status=400)
         finally:
-            print(f"Removing temporary file: {resume_path}")
             os.remove(resume_path)
 
-        print("Loading environment variables...")
-        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-        print(f"GROQ API key loaded: {GROQ_API_KEY is not None}")
-
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json",
-        }
-        print("API headers prepared")
-
-        prompt = f"""
-        You are an advanced ATS (Applicant Tracking System) assistant specializing in software and IT jobs.
-        Read the resume and job description, then return a detailed JSON analysis with the following:
-
-        1. rank → Match score from 0–100 showing how well the resume fits the job.
-        2. skills → List of all hard (technical) and soft skills found in the resume.
-        3. total_experience → Total professional experience in years (approximate if needed).
-        4. project_category → Categories or domains of projects in the resume (e.g., AI, Web Development, Cloud, Data Science, Mobile Apps, etc.).
-        5. missing_skills → List of important skills in the job description that are not clearly mentioned in the resume.
-        6. improvement_suggestions → Actionable ways the candidate can improve the resume for better ATS and recruiter match rates.
-
-        Resume:
-        {resume_text}
-
-        Job Description:
-        {job_description}
-
-        Respond ONLY with valid JSON in the exact structure below:
-        {{
-            "rank": <number>,
-            "skills": ["skill1", "skill2", ...],
-            "total_experience": <number>,
-            "project_category": ["category1", "category2", ...],
-            "missing_skills": ["skill1", "skill2", ...],
-            "improvement_suggestions": ["suggestion1", "suggestion2", ...]
-        }}
-        """
-
-        payload = {
-            "model": "deepseek-r1-distill-llama-70b",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a highly accurate and concise job matching assistant.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-            "response_format": {"type": "json_object"},
-        }
-
-        groq_resp = requests.post(url, headers=headers, json=payload)
-        print("Groq API raw response:", groq_resp.text)
-
-        try:
-            match = groq_resp.json()["choices"][0]["message"]["content"]
-        except Exception:
-            match = (
-                f"Could not get a response from Groq. Raw response: {groq_resp.text}"
+        stream = request.POST.get("stream", "").lower() in ("1", "true")
+        if stream or "text/event-stream" in request.headers.get("Accept", ""):
+            response = StreamingHttpResponse(
+                match_event_stream(resume_text, job_description),
+                content_type="text/event-stream",
             )
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            response["Access-Control-Allow-Origin"] = "*"
+            return response
+
+        match, _ = await arequest_match(resume_text, job_description)
 
         response = JsonResponse({"match": match})
         response["Access-Control-Allow-Origin"] = "*"
@@ -140,38 +144,76 @@ def groq_match_resume_job(request):
 
 
 @csrf_exempt
+@cache_control(no_cache=True)
+@condition(etag_func=jobs_list_etag, last_modified_func=jobs_list_last_modified)
 def paginated_jobs(request):
-    if request.method == "POST":
+    """
+    Page through jobs ordered by id.
+
+    Send page_no/page_size for classic offset paging, or cursor/page_size to
+    walk the table with a keyset cursor: pass "cursor": null for the first
+    page, then the returned next_cursor until it comes back null. Cursor
+    pages cost the same however deep they are and don't shift when jobs are
+    added or removed between calls.
+
+    "fields" (list or comma-separated) picks the columns returned and
+    "description" is full, snippet or none; only those columns are read
+    from the database.
+
+    min_salary/max_salary (annual dollars), salary_period, city, region,
+    country and remote filter the jobs in SQL; see JobFilter. With
+    JOB_CATALOG_SNAPSHOT on, the page is served from the in-memory catalog
+    snapshot instead of the database.
+
+    The same parameters work as a GET query string; GET responses carry an
+    ETag and Last-Modified so pollers get a 304 until the catalog changes.
+    """
+    if request.method in ("GET", "POST"):
         try:
-            data = json.loads(request.body)
-            page_no = int(data.get("page_no", 1))
+            if request.method == "GET":
+                data = request.GET.dict()
+            else:
+                data = json.loads(request.body)
             page_size = int(data.get("page_size", 10))
-            if page_no < 1 or page_size < 1:
+            cursor_mode = "cursor" in data
+            page_no = None if cursor_mode else int(data.get("page_no", 1))
+            if page_size < 1 or (page_no is not None and page_no < 1):
                 return JsonResponse(
                     {"error": "page_no and page_size must be positive integers."},
                     status=400,
                 )
-            start = (page_no - 1) * page_size
-            end = start + page_size
-            jobs = Job.objects.all()[start:end]
-            jobs_data = [
-                {
-                    "id": job.pk,
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "description": job.description,
-                }
-                for job in jobs
-            ]
-            return JsonResponse(
-                {"jobs": jobs_data, "page_no": page_no, "page_size": page_size},
-                status=200,
-            )
+            fields = parse_fields(data.get("fields"), PAGINATED_JOB_FIELDS)
+            description = parse_description_mode(data.get("description"))
+            last_id = decode_cursor(data["cursor"]) if cursor_mode else None
+            start = 0 if cursor_mode else (page_no - 1) * page_size
+            if settings.JOB_CATALOG_SNAPSHOT:
+                catalog = get_catalog(catalog_state(request))
+                rows = catalog.filter(clean_job_filters(data))
+                if last_id is not None:
+                    rows = catalog.after(rows, last_id)
+                rows = rows[start : start + page_size + 1]
+                jobs = catalog.project(rows, fields, description)
+            else:
+                jobs = filter_jobs(Job.objects.order_by("id"), data)
+                jobs = project_jobs(jobs, fields, description)
+                if last_id is not None:
+                    jobs = jobs.filter(id__gt=last_id)
+                jobs = list(jobs[start : start + page_size + 1])
+            has_more = len(jobs) > page_size
+            jobs = jobs[:page_size]
+            jobs_data = [serialize_job(job, fields, description) for job in jobs]
+            next_cursor = encode_cursor(jobs[-1]["id"]) if has_more else None
+            response_data = {"jobs": jobs_data, "page_size": page_size}
+            if not cursor_mode:
+                response_data["page_no"] = page_no
+            response_data["next_cursor"] = next_cursor
+            return JsonResponse(response_data, status=200)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
     else:
-        return JsonResponse({"error": "Only POST requests are allowed."}, status=405)
+        return JsonResponse(
+            {"error": "Only GET and POST requests are allowed."}, status=405
+        )
 
 
 # Load environment variables from .env file
@@ -184,80 +226,74 @@ load_dotenv(
 
 
 @csrf_exempt
-def groq_match(request):
+async def groq_match(request):
     if request.method == "POST":
         data = json.loads(request.body)
         resume_id = data.get("resume_id")
         job_id = data.get("job_id")
         try:
-            resume = Resume.objects.get(id=resume_id)
-            job = Job.objects.get(id=job_id)
-            resume_text = extract_text_from_pdf(resume.file.path)
-            job_text = f"{job.title}\n{job.company}\n{job.location}\n{job.description}"
+            resume = await Resume.objects.aget(id=resume_id)
+            job = await Job.objects.aget(id=job_id)
+            result = await amatch_resume_to_job(resume, job)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
-        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json",
-        }
-
-        prompt = f"""
-        You are an advanced ATS (Applicant Tracking System) assistant specializing in software and IT jobs.
-        Read the resume and job description, then return a detailed JSON analysis with the following:
-
-        1. rank → Match score from 0–100 showing how well the resume fits the job.
-        2. skills → List of all hard (technical) and soft skills found in the resume.
-        3. total_experience → Total professional experience in years (approximate if needed).
-        4. project_category → Categories or domains of projects in the resume (e.g., AI, Web Development, Cloud, Data Science, Mobile Apps, etc.).
-        5. missing_skills → List of important skills in the job description that are not clearly mentioned in the resume.
-        6. improvement_suggestions → Actionable ways the candidate can improve the resume for better ATS and recruiter match rates.
-
-        Resume:
-        {resume_text}
-
-        Job Description:
-        {job_text}
-
-        Respond ONLY with valid JSON in the exact structure below:
-        {{
-            "rank": <number>,
-            "skills": ["skill1", "skill2", ...],
-            "total_experience": <number>,
-            "project_category": ["category1", "category2", ...],
-            "missing_skills": ["skill1", "skill2", ...],
-            "improvement_suggestions": ["suggestion1", "suggestion2", ...]
-        }}
-        """
-
-        payload = {
-            "model": "deepseek-r1-distill-llama-70b",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a highly accurate and concise job matching assistant.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-            "response_format": {"type": "json_object"},
-        }
-
-        groq_resp = requests.post(url, headers=headers, json=payload)
-        print("Groq API raw response:", groq_resp.text)
+        return JsonResponse(result)
+    else:
+        return JsonResponse({"error": "Only POST requests are allowed."}, status=405)
+
 
+@csrf_exempt
+@require_http_methods(["POST"])
+async def groq_match_batch(request):
+    """
+    Match one resume against many jobs, streaming one NDJSON line per job.
+
+    Accepts {"resume_id": ..., "job_ids": [...]} or {"resume_id": ...,
+    "query": "...", "limit": n} to pick jobs whose title or description
+    contains the query. Groq calls run concurrently on the event loop, at
+    most GROQ_MAX_CONCURRENCY at a time, and each result is written as soon
+    as it completes.
+    """
+    try:
+        data = json.loads(request.body)
+        resume = await Resume.objects.aget(id=data.get("resume_id"))
+        job_ids = data.get("job_ids")
+        if job_ids is not None:
+            jobs = Job.objects.filter(id__in=job_ids)
+        else:
+            query = data.get("query", "")
+            jobs = Job.objects.filter(
+                Q(title__icontains=query) | Q(description__icontains=query)
+            ).order_by("id")
+        limit = min(
+            int(data.get("limit", settings.MATCH_BATCH_MAX_JOBS)),
+            settings.MATCH_BATCH_MAX_JOBS,
+        )
+        jobs = [job async for job in jobs[:limit]]
+        resume_hash = await asyncio.to_thread(file_sha256, resume.file.path)
+        resume_text = await aget_resume_text(resume)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    async def stream():
+        slots = asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY)
+
+        async def match(job):
+            async with slots:
+                return await amatch_result_line(resume, job, resume_hash, resume_text)
+
+        tasks = [asyncio.ensure_future(match(job)) for job in jobs]
         try:
-            match = groq_resp.json()["choices"][0]["message"]["content"]
-        except Exception:
-            match = (
-                f"Could not get a response from Groq. Raw response: {groq_resp.text}"
-            )
+            for result in asyncio.as_completed(tasks):
+                yield json.dumps(await result) + "\n"
+        finally:
+            # Client went away; don't start the Groq calls still queued
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({"done": True, "count": len(jobs)}) + "\n"
 
-        return JsonResponse({"match": match})
-    else:
-        return JsonResponse({"error": "Only POST requests are allowed."}, status=405)
+    return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
 
 
 def compatible_jobs_page(request):
@@ -272,36 +308,34 @@ class ResumeUploadView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            # Save and return only the new Resume ID
+            # Save, queue text extraction and return the new Resume ID
             instance = serializer.save()
-            return Response({"id": instance.id}, status=status.HTTP_201_CREATED)
+            record = enqueue_resume_extraction(instance)
+            return Response(
+                {"id": instance.id, "text_status": record.status},
+                status=status.HTTP_201_CREATED,
+            )
         # Return validation errors
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def extract_job_data(request):
+async def extract_job_data(request):
     """
     Endpoint for extracting structured job data from job descriptions using Groq API.
 
     Accepts POST requests with job description text and returns structured JSON data.
+    Descriptions extracted before are served from the JobExtraction cache.
     """
     try:
-        # Load environment variables
-        load_dotenv()
-
-        # Get the Groq API key
-        groq_api_key = os.getenv("GROQ_API_KEY")
-
-        if not groq_api_key:
+        if not os.getenv("GROQ_API_KEY"):
             return JsonResponse(
                 {"error": "GROQ API key not found in environment variables"}, status=500
             )
 
         # Parse the request body
-        body_unicode = request.body.decode("utf-8")
-        body = json.loads(body_unicode)
+        body = json.loads(request.body.decode("utf-8"))
 
         # Get the job description from the request
         job_description = body.get("description", "")
@@ -309,93 +343,49 @@ def extract_job_data(request):
         if not job_description:
             return JsonResponse({"error": "No job description provided"}, status=400)
 
-        # Create the Groq API request
-        headers = {
-            "Authorization": f"Bearer {groq_api_key}",
-            "Content-Type": "application/json",
-        }
-
-        prompt = f"""
-You are an information extraction system.  
-Given a job description, return ONLY a valid JSON object with the following fields:  
-
-{{
-  "title": string,               // Exact official job title
-  "description": string,         // Cleaned job description
-  "salary": number,              // Minimum yearly salary if range exists, else 0
-  "experienceLevel": number,     // 0 = Entry-level/Fresher, 1 = Mid-level, 2 = Senior
-  "location": [string],          // Array of job locations
-  "jobType": string,             // Example: "Full-time", "Part-time", "Internship", "Contract"
-  "requirements": [string],      // Bullet points of qualifications/skills/experience
-  "company": string              // Main company name
-}}
-
-Rules:
-- Do not invent data. If missing, leave as 0, empty string, or empty array.
-- Output must be valid JSON only (starting with {{ and ending with }}).
-- Do not include metadata like djangoJobId, createdAt, updatedAt, applications, __v.
-- Only return extracted values from the description.
-
-Job Description:
-{job_description}
-"""
-
-        payload = {
-            "model": "llama3-70b-8192",  # Using Llama 3 70B model for structured extraction
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,  # Lower temperature for more deterministic output
-            "max_tokens": 2048,
-        }
-
-        # Make the API request to Groq
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30,
-        )
-
-        # Check for successful response
-        if response.status_code == 200:
-            response_data = response.json()
-            extracted_data = response_data["choices"][0]["message"]["content"]
-
-            # Clean the response to ensure it's valid JSON
-            extracted_data = extracted_data.strip()
-
-            # Remove any possible markdown code block markers
-            if extracted_data.startswith("```json"):
-                extracted_data = extracted_data[7:]
-            if extracted_data.endswith("```"):
-                extracted_data = extracted_data[:-3]
-
-            extracted_data = extracted_data.strip()
-
-            try:
-                # Parse the extracted JSON data
-                parsed_data = json.loads(extracted_data)
-                return JsonResponse(parsed_data, safe=True)
-            except json.JSONDecodeError as e:
-                return JsonResponse(
-                    {
-                        "error": "Failed to parse extracted data as JSON",
-                        "details": str(e),
-                        "raw_data": extracted_data,
-                    },
-                    status=500,
-                )
-        else:
-            # Return error response
-            return JsonResponse(
-                {
-                    "error": "Error from Groq API",
-                    "status_code": response.status_code,
-                    "response": response.text,
-                },
-                status=response.status_code,
-            )
+        try:
+            parsed_data, _ = await aextract_job_data(job_description)
+        except GroqUnavailable as e:
+            return JsonResponse({"error": str(e)}, status=503)
+        except ExtractionError as e:
+            return JsonResponse(e.body, status=e.status)
+        return JsonResponse(parsed_data, safe=True)
 
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON in request body"}, status=400)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def extract_job_data_batch(request):
+    """
+    Batch extract_job_data: POST {"descriptions": [...]} and get one result
+    per description, in order, plus counts of cache hits and Groq calls.
+    Repeated descriptions are extracted once and cached ones cost nothing.
+    """
+    if not os.getenv("GROQ_API_KEY"):
+        return JsonResponse(
+            {"error": "GROQ API key not found in environment variables"}, status=500
+        )
+    try:
+        descriptions = json.loads(request.body.decode("utf-8")).get("descriptions")
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Invalid JSON in request body"}, status=400)
+    if not isinstance(descriptions, list) or not descriptions:
+        return JsonResponse(
+            {"error": "descriptions must be a non-empty list"}, status=400
+        )
+    if len(descriptions) > settings.EXTRACT_BATCH_MAX:
+        return JsonResponse(
+            {"error": f"At most {settings.EXTRACT_BATCH_MAX} descriptions per request"},
+            status=400,
+        )
+    if not all(isinstance(d, str) and d.strip() for d in descriptions):
+        return JsonResponse(
+            {"error": "Every description must be a non-empty string"}, status=400
+        )
+
+    results, stats = await aextract_job_data_batch(descriptions)
+    return JsonResponse({"results": results, "stats": stats})